@@ -0,0 +1,20 @@
+{#-
+  Build-generation stamp: every dbt run or build that (re)builds at least one model appends
+  a row to build_generation (on-run-end in dbt_project.yml). The MXCP result cache
+  (python/result_cache.py) compares max(generation) with the generation its entries were
+  computed on and drops them once the database has been rebuilt.
+-#}
+{% macro stamp_build_generation(results) %}
+    {% set built = results
+        | selectattr('node.resource_type', 'equalto', 'model')
+        | selectattr('status', 'equalto', 'success')
+        | list %}
+    {% if execute and flags.WHICH in ('run', 'build') and built %}
+        {% set relation = api.Relation.create(database=target.database, schema=target.schema, identifier='build_generation') %}
+        {% do run_query("CREATE TABLE IF NOT EXISTS " ~ relation ~ " (generation BIGINT, invocation_id VARCHAR, built_at TIMESTAMP)") %}
+        {% do run_query(
+            "INSERT INTO " ~ relation
+            ~ " SELECT COALESCE(max(generation), 0) + 1, '" ~ invocation_id ~ "', current_timestamp::TIMESTAMP FROM " ~ relation
+        ) %}
+    {% endif %}
+{% endmacro %}
@@ -0,0 +1,35 @@
+{#-
+  Keys of dim_licenses, shared by the model and its pre-hook.
+
+  license_pk identifies a license: an md5 over the issuing authority and the license number.
+  license_sk is its 64-bit surrogate (the first 16 hex digits), see dim_licenses.sql.
+-#}
+{% macro license_pk_sql() -%}
+    md5(COALESCE(issuance_authority_en, '') || '|' || COALESCE(bl, ''))
+{%- endmacro %}
+
+{#-
+  license_sk keeps 64 of the 128 bits of license_pk, so two licenses can share one. For n
+  licenses the chance of any collision is about n^2 / 2^65: 3e-8 for a million licenses,
+  3e-6 for ten million. A collision is not prevented, only detected after the fact by
+  tests/assert_license_sk_identifies_one_license.sql, and until then the two licenses are
+  merged: counted once, replaced together by delete+insert and paged as one.
+-#}
+{% macro license_sk_sql(license_pk) -%}
+    CAST('0x' || left({{ license_pk }}, 16) AS UBIGINT)
+{%- endmacro %}
+
+{#-
+  Pre-hook of dim_licenses: delete the licenses that no longer have any source row.
+  delete+insert only replaces the keys present in the new batch, and a license removed from
+  the source has no row in it, so without this its old rows would stay in the mart.
+-#}
+{% macro delete_removed_licenses() %}
+    {%- if is_incremental() -%}
+DELETE FROM {{ this }}
+WHERE license_sk NOT IN (
+    SELECT {{ license_sk_sql(license_pk_sql()) }}
+    FROM {{ ref('stg_licenses_raw') }}
+)
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,48 @@
+{#-
+  ART indexes on the lookup marts. They are dropped when a run starts and recreated once
+  all models are built (on-run-start / on-run-end in dbt_project.yml): dbt-duckdb swaps
+  tables by renaming them, and swapping an indexed table while other models build on the
+  same database fails with catalog errors when the run uses several threads.
+
+  Only `dbt run` and `dbt build` touch them: a run drops the indexes of the marts it is
+  about to rebuild, and dbt test, docs, compile or seed leave the database alone.
+-#}
+{% macro mart_indexes() %}
+    {{ return({
+        'dim_licenses_categorical_values': {
+            'dim_licenses_categorical_values_field_idx': ['field']
+        },
+        'dim_licenses_categorical_trigrams': {
+            'dim_licenses_categorical_trigrams_field_trigram_idx': ['field', 'trigram']
+        },
+        'dim_licenses_ar_normalized': {
+            'dim_licenses_ar_normalized_field_value_norm_idx': ['field', 'value_norm']
+        }
+    }) }}
+{% endmacro %}
+
+{% macro drop_mart_indexes() %}
+    {% if execute and flags.WHICH in ('run', 'build') %}
+        {% for table, indexes in mart_indexes().items() %}
+            {% if 'model.' ~ project_name ~ '.' ~ table in selected_resources %}
+                {% for index_name in indexes %}
+                    {% do run_query("DROP INDEX IF EXISTS " ~ index_name) %}
+                {% endfor %}
+            {% endif %}
+        {% endfor %}
+    {% endif %}
+{% endmacro %}
+
+{% macro create_mart_indexes() %}
+    {% if not (execute and flags.WHICH in ('run', 'build')) %}
+        {% do return('') %}
+    {% endif %}
+    {% for table, indexes in mart_indexes().items() %}
+        {% set relation = adapter.get_relation(database=target.database, schema=target.schema, identifier=table) %}
+        {% if relation is not none %}
+            {% for index_name, columns in indexes.items() %}
+                {% do run_query("CREATE INDEX IF NOT EXISTS " ~ index_name ~ " ON " ~ relation ~ " (" ~ columns | join(', ') ~ ")") %}
+            {% endfor %}
+        {% endif %}
+    {% endfor %}
+{% endmacro %}
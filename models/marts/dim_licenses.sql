@@ -1,46 +1,227 @@
-{{ config(materialized='table', tags=["marts"], contract={"enforced": True}) }}
+{{ config(
+    materialized='incremental',
+    unique_key='license_sk',
+    incremental_strategy='delete+insert',
+    on_schema_change='fail',
+    pre_hook="{{ delete_removed_licenses() }}",
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
 
+{#-
+  Coordinates are parsed with one anchored regex per value. The common DMS shape
+  (e.g. 25°12'30.5"N) is handled by dms_parts(); decimal strings with a hemisphere
+  (e.g. 25.0735°N) by decimal_parts(); anything else falls through to
+  dms_to_dd_fallback(), which keeps the original four-regex semantics. All three
+  paths return exactly what the original dms_to_dd macro returned, with NULL for
+  malformed input.
+-#}
 {% set dms_to_dd %}
-CREATE OR REPLACE MACRO dms_to_dd(dms) AS (
+CREATE OR REPLACE MACRO dms_to_dd_fallback(dms) AS (
+    CASE
+        WHEN NOT regexp_matches(dms, '[NSEW]$') THEN NULL   -- malformed DMS → NULL
+        ELSE
+            (CASE WHEN regexp_matches(dms, '[SW]$') THEN -1 ELSE 1 END) *
+            (  TRY_CAST(NULLIF(regexp_extract(dms,'([0-9]+)',1),'') AS DOUBLE)
+             + TRY_CAST(NULLIF(regexp_extract(dms,'[0-9]+.*?([0-9]+)',1),'') AS DOUBLE)/60
+             + TRY_CAST(NULLIF(regexp_extract(dms,'([0-9.]+)[^0-9]*[NSEW]',1),'') AS DOUBLE)/3600)
+    END
+);
+
+CREATE OR REPLACE MACRO dms_parts(dms) AS
+    regexp_extract(
+        dms,
+        '^[^0-9.NSEW]*([0-9]+)[^0-9.NSEW]+([0-9]+)[^0-9.NSEW]+([0-9]+(?:\.[0-9]+)?)[^0-9.NSEW]*([NSEW])$',
+        ['deg', 'minu', 'sec', 'hemi']
+    );
+
+CREATE OR REPLACE MACRO decimal_parts(dms) AS
+    regexp_extract(
+        dms,
+        '^[^0-9.NSEW]*([0-9]+)\.([0-9]+)[^0-9.NSEW]*([NSEW])$',
+        ['deg', 'frac', 'hemi']
+    );
+
+CREATE OR REPLACE MACRO decimal_parts_to_dd(p, dms) AS (
+    CASE
+        WHEN p.hemi <> '' THEN
+            (CASE WHEN p.hemi IN ('S','W') THEN -1 ELSE 1 END) *
+            (TRY_CAST(p.deg AS DOUBLE) + TRY_CAST(p.frac AS DOUBLE)/60 + TRY_CAST(p.deg || '.' || p.frac AS DOUBLE)/3600)
+        ELSE dms_to_dd_fallback(dms)
+    END
+);
+
+-- p is the struct returned by dms_parts(dms); compute it once per value and pass it in.
+-- TRY_CAST because the optimizer may hoist the casts above the hemi guard; the regex
+-- only matches digits, so they never fail on rows the guard lets through.
+CREATE OR REPLACE MACRO dms_parts_to_dd(p, dms) AS (
     CASE
         WHEN dms IS NULL THEN NULL
-        ELSE (
-            WITH p AS (
-                SELECT
-                    NULLIF(regexp_extract(dms,'([0-9]+)',1),'')::DOUBLE            AS deg ,
-                    NULLIF(regexp_extract(dms,'[0-9]+.*?([0-9]+)',1),'')::DOUBLE   AS minu ,
-                    NULLIF(regexp_extract(dms,'([0-9.]+)[^0-9]*[NSEW]',1),'')::DOUBLE AS sec ,
-                    regexp_extract(dms,'([NSEW])$',1)                              AS hemi
-            )
-            SELECT
-                CASE
-                    WHEN deg IS NULL OR minu IS NULL OR sec IS NULL OR hemi = ''
-                    THEN NULL                       -- malformed DMS → NULL
-                    ELSE
-                        (CASE WHEN hemi IN ('S','W') THEN -1 ELSE 1 END) *
-                        (deg + minu/60 + sec/3600)
-                END
-            FROM p
-        )
+        WHEN p.hemi <> '' THEN
+            (CASE WHEN p.hemi IN ('S','W') THEN -1 ELSE 1 END) *
+            (TRY_CAST(p.deg AS DOUBLE) + TRY_CAST(p.minu AS DOUBLE)/60 + TRY_CAST(p.sec AS DOUBLE)/3600)
+        ELSE decimal_parts_to_dd(decimal_parts(dms), dms)
+    END
+);
+
+-- Convenience wrapper for ad-hoc use; the lambda binds dms_parts(dms) once.
+CREATE OR REPLACE MACRO dms_to_dd(dms) AS
+    list_transform([dms_parts(dms)], p -> dms_parts_to_dd(p, dms))[1];
+
+-- 0.01 degree grid cell (about 1.1 km): row * 36000 + column, where row and column count
+-- cells from -90 latitude and -180 longitude. NULL without both coordinates or when they
+-- fall outside [-90, 90] x [-180, 180), where the numbering would overlap.
+CREATE OR REPLACE MACRO geo_cell(lat, lon) AS (
+    CASE
+        WHEN lat BETWEEN -90 AND 90 AND lon >= -180 AND lon < 180 THEN
+            CAST(floor((lat + 90) * 100) AS BIGINT) * 36000 + CAST(floor((lon + 180) * 100) AS BIGINT)
     END
 );
 {% endset %}
 
 {% do run_query(dms_to_dd) %}
 
+{#-
+  Low-cardinality categorical columns are stored as ENUMs, one type per column named
+  <column>_enum, so filters, GROUP BYs and sorts on them work on small integer codes. The
+  domain of each type is the set of values observed in the source, in sorted order, so
+  ordering by an ENUM column matches ordering by its text.
+
+  Full builds (re)create the types. Incremental runs keep them, because the stored rows
+  use the existing codes, and fail when the source holds a value the type does not know;
+  a --full-refresh run then rebuilds the types and the table.
+-#}
+{% set enum_columns = [
+    'emirate_name_en',
+    'bl_status_en',
+    'bl_type_en',
+    'bl_legal_type_en',
+    'owner_gender',
+    'relationship_type_en'
+] %}
+
+{% set enum_domains %}
+WITH observed AS (
+    SELECT field, list(DISTINCT value ORDER BY value) AS labels
+    FROM (
+        UNPIVOT (
+            SELECT {{ enum_columns | join(', ') }}
+            FROM {{ ref('stg_licenses_raw') }}
+        )
+        ON {{ enum_columns | join(', ') }}
+        INTO NAME field VALUE value
+    )
+    GROUP BY field
+)
 SELECT
-    -- corrected field name (bl_num) -> now corrected to include activity to create a unique PK
-    md5(
-        COALESCE(issuance_authority_en, '') || '|' ||
-        COALESCE(bl, '')
-    ) AS license_pk,
-    s.*,
-
-    -- proper DATEs
-    STRPTIME(bl_est_date, '%d/%m/%Y')::DATE            AS bl_est_date_d,
-    STRPTIME(bl_exp_date, '%d/%m/%Y')::DATE            AS bl_exp_date_d,
-
-    -- decimal degrees (safe macro)
-    dms_to_dd(license_latitude)                        AS lat_dd,
-    dms_to_dd(license_longitude)                       AS lon_dd
-FROM {{ ref('stg_licenses_raw') }} AS s
+    o.field,
+    'ENUM (' || array_to_string(list_transform(o.labels, v -> '''' || replace(v, '''', '''''') || ''''), ', ') || ')' AS enum_sql,
+    t.labels IS NOT NULL AS type_exists,
+    array_to_string(list_filter(o.labels, v -> NOT list_contains(t.labels, v)), ', ') AS new_values
+FROM observed AS o
+LEFT JOIN duckdb_types() AS t
+    ON t.database_name = current_database()
+   AND t.schema_name = current_schema()
+   AND t.type_name = o.field || '_enum'
+{% endset %}
+
+{% if execute %}
+    {% for domain in run_query(enum_domains) %}
+        {% if is_incremental() and domain['type_exists'] %}
+            {% if domain['new_values'] %}
+                {{ exceptions.raise_compiler_error(
+                    "New " ~ domain['field'] ~ " values not in " ~ domain['field'] ~ "_enum: " ~ domain['new_values']
+                    ~ ". Rebuild with dbt run --full-refresh to extend the ENUM types."
+                ) }}
+            {% endif %}
+        {% else %}
+            {% do run_query("CREATE OR REPLACE TYPE " ~ domain['field'] ~ "_enum AS " ~ domain['enum_sql']) %}
+        {% endif %}
+    {% endfor %}
+{% endif %}
+
+{% set sort_by = var('dim_licenses_sort_by') %}
+{% if sort_by is string %}
+    {% set sort_by = sort_by.split(',') | map('trim') | list %}
+{% endif %}
+
+WITH src AS (
+    SELECT
+        -- corrected field name (bl_num) -> now corrected to include activity to create a unique PK
+        {{ license_pk_sql() }} AS license_pk,
+        -- 64-bit surrogate of license_pk (its first 16 hex digits), used for distinct counts,
+        -- joins, index postings and cursors; license_pk stays the external identifier
+        -- Not collision-free: two licenses sharing the 64-bit prefix would be merged until
+        -- assert_license_sk_identifies_one_license fails (see license_sk_sql)
+        {{ license_sk_sql('license_pk') }} AS license_sk,
+        -- fingerprint of the raw source row, used to detect changed licenses between runs
+        md5(CAST(s AS VARCHAR)) AS source_hash,
+        s.*
+    FROM {{ ref('stg_licenses_raw') }} AS s
+)
+
+{% if is_incremental() %}
+-- Only licenses with at least one added, edited or removed source row since the last run
+-- are re-processed. All rows of such a license are re-inserted, because delete+insert
+-- replaces every row that shares its license_sk. Licenses with no source row left are
+-- deleted by the pre-hook (delete_removed_licenses in macros/license_keys.sql).
+--
+-- Finding the changes is not incremental: every run hashes every source row and compares
+-- all (license_sk, source_hash) pairs of the source and the mart in both directions, so it
+-- costs O(source + target) per run. Only the parsing and the writes scale with the change.
+, changed AS (
+    SELECT license_sk FROM (
+        SELECT license_sk, source_hash FROM src
+        EXCEPT ALL
+        SELECT license_sk, source_hash FROM {{ this }}
+    )
+    UNION
+    SELECT license_sk FROM (
+        SELECT license_sk, source_hash FROM {{ this }}
+        EXCEPT ALL
+        SELECT license_sk, source_hash FROM src
+    )
+)
+{% endif %}
+
+, parsed AS (
+    SELECT
+        src.*,
+        dms_parts(license_latitude)                    AS lat_parts,
+        dms_parts(license_longitude)                   AS lon_parts
+    FROM src
+    {% if is_incremental() %}
+    WHERE src.license_sk IN (SELECT license_sk FROM changed)
+    {% endif %}
+)
+
+SELECT
+    parsed.* EXCLUDE (lat_parts, lon_parts) REPLACE (
+        {%- for column in enum_columns %}
+        CAST({{ column }} AS {{ column }}_enum) AS {{ column }},
+        {%- endfor %}
+        -- the dates as published (staging reads them as DATE)
+        strftime(bl_est_date, '%d/%m/%Y') AS bl_est_date,
+        strftime(bl_exp_date, '%d/%m/%Y') AS bl_exp_date
+    ),
+
+    -- proper DATEs, typed by src_licenses
+    parsed.bl_est_date                                 AS bl_est_date_d,
+    parsed.bl_exp_date                                 AS bl_exp_date_d,
+
+    -- decimal degrees (safe macros)
+    dms_parts_to_dd(lat_parts, license_latitude)       AS lat_dd,
+    dms_parts_to_dd(lon_parts, license_longitude)      AS lon_dd,
+
+    -- spatial grid cell, see geo_cell() above and dim_licenses_geo_cells
+    geo_cell(lat_dd, lon_dd)                           AS geo_cell,
+
+    -- numbers identical source rows of a license (same source_hash) 1, 2, ..., so the
+    -- paging cursors can tell them apart; always 1 for a row without duplicates. All rows
+    -- of a license are (re)inserted together, so the numbering stays dense.
+    row_number() OVER (PARTITION BY license_sk, source_hash) AS duplicate_seq
+FROM parsed
+-- Physical row order (var dim_licenses_sort_by), so DuckDB's per-row-group min/max zone
+-- maps let filters and ORDER BY ... LIMIT on the leading columns skip row groups.
+-- Incremental runs append each batch in this order.
+ORDER BY {{ sort_by | join(', ') }}
@@ -0,0 +1,59 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+{#-
+  Normalized shadow values for the Arabic license columns, one record per field and
+  distinct value. The license tools match the `_ar` and `_ar_like` filters on value_norm,
+  so spelling variants of the same name are found by a single query.
+
+  normalize_ar() strips diacritics (harakat, U+064B-U+065F, and superscript alef, U+0670)
+  and tatweel (U+0640), folds alef variants (أ إ آ ٱ) to ا, taa marbuta (ة) to ه,
+  alef maqsura (ى) to ي, and hamza carriers ؤ / ئ to و / ي. Non-Arabic text passes
+  through unchanged.
+-#}
+{% set normalize_ar %}
+CREATE OR REPLACE MACRO normalize_ar(s) AS
+    translate(
+        regexp_replace(s, '[\x{064B}-\x{065F}\x{0670}\x{0640}]', '', 'g'),
+        'أإآٱةىؤئ',
+        'ااااهيوي'
+    );
+{% endset %}
+
+{% do run_query(normalize_ar) %}
+
+{% set arabic_fields = [
+    'emirate_name_ar',
+    'issuance_authority_ar',
+    'issuance_authority_branch_ar',
+    'bl_name_ar',
+    'bl_status_ar',
+    'bl_legal_type_ar',
+    'bl_type_ar',
+    'parent_license_issuance_authority_ar',
+    'relationship_type_ar',
+    'owner_nationality_ar',
+    'business_activity_desc_ar'
+] %}
+
+WITH field_values AS (
+    SELECT DISTINCT field, value
+    FROM (
+        UNPIVOT (
+            SELECT {{ arabic_fields | join(', ') }}
+            FROM {{ ref('dim_licenses') }}
+        )
+        ON {{ arabic_fields | join(', ') }}
+        INTO NAME field VALUE value
+    )
+)
+
+SELECT
+    field,
+    value,
+    normalize_ar(value)                                 AS value_norm
+FROM field_values
+ORDER BY field, value_norm
@@ -0,0 +1,37 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+{#-
+  Trigram index over the categorical value dictionary, used by the match_license_values
+  tool to find the valid values closest to a misspelled one. Trigrams are taken from the
+  lower-cased value padded with two leading spaces and one trailing space, so short values
+  and word starts still produce trigrams. Works the same for English and Arabic text.
+-#}
+{% set trigrams %}
+CREATE OR REPLACE MACRO trigrams(s) AS
+    list_distinct(list_transform(
+        generate_series(1, length('  ' || lower(s) || ' ') - 2),
+        i -> substring('  ' || lower(s) || ' ', i, 3)
+    ));
+{% endset %}
+
+{% do run_query(trigrams) %}
+
+WITH value_trigrams AS (
+    SELECT
+        field,
+        value,
+        trigrams(value) AS value_trigrams
+    FROM {{ ref('dim_licenses_categorical_values') }}
+)
+
+SELECT
+    field,
+    UNNEST(value_trigrams)                              AS trigram,
+    value,
+    len(value_trigrams)::BIGINT                         AS value_trigram_count
+FROM value_trigrams
+ORDER BY field, trigram
@@ -0,0 +1,50 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+{#-
+  Distinct values of the categorical license columns with their frequencies, built once
+  per run from a single scan of dim_licenses. Serves the categorical_license_values tool,
+  which used to group the whole table once per field on every call.
+-#}
+{% set categorical_fields = [
+    'license_branch_flag',
+    'owner_gender',
+    'bl_status_en',
+    'bl_status_ar',
+    'emirate_name_en',
+    'emirate_name_ar',
+    'issuance_authority_branch_ar',
+    'parent_license_issuance_authority_ar',
+    'parent_license_issuance_authority_en',
+    'relationship_type_en',
+    'relationship_type_ar',
+    'bl_type_en',
+    'bl_type_ar',
+    'bl_legal_type_en',
+    'bl_legal_type_ar',
+    'owner_nationality_en',
+    'owner_nationality_ar'
+] %}
+
+WITH field_values AS (
+    -- UNPIVOT drops NULLs, matching the IS NOT NULL filter of the per-field queries
+    UNPIVOT (
+        SELECT {{ categorical_fields | join(', ') }}
+        FROM {{ ref('dim_licenses') }}
+    )
+    ON {{ categorical_fields | join(', ') }}
+    INTO NAME field VALUE value
+)
+
+SELECT
+    field,
+    value,
+    COUNT(*)                                                      AS freq,
+    ROW_NUMBER() OVER (PARTITION BY field ORDER BY COUNT(*) DESC, value) AS rank
+FROM field_values
+GROUP BY field, value
+-- keeps each field's values contiguous, so a lookup by field touches few row groups
+ORDER BY field, rank
@@ -0,0 +1,40 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+{#-
+  Pre-aggregated license counts behind the aggregate_licenses tool: COUNT(DISTINCT license_sk)
+  for the grand total, every single dimension and every pair of the seven group_by
+  dimensions. Distinct counts do not add up, so each grouping set is stored on its own and
+  identified by grouping_id (the GROUPING() bitmask over the dimensions, in the order
+  below, where a set bit means the dimension is rolled up).
+-#}
+{% set cube_dimensions = [
+    'emirate_name_en',
+    'bl_status_en',
+    'bl_type_en',
+    'bl_legal_type_en',
+    'owner_nationality_en',
+    'relationship_type_en',
+    'owner_gender'
+] %}
+
+SELECT
+    {{ cube_dimensions | join(',\n    ') }},
+    GROUPING({{ cube_dimensions | join(', ') }})::INTEGER  AS grouping_id,
+    COUNT(DISTINCT license_sk)                              AS license_count
+FROM {{ ref('dim_licenses') }}
+GROUP BY GROUPING SETS (
+    ()
+    {%- for dim in cube_dimensions %},
+    ({{ dim }})
+    {%- endfor %}
+    {%- for first in cube_dimensions %}
+    {%- for second in cube_dimensions[loop.index:] %},
+    ({{ first }}, {{ second }})
+    {%- endfor %}
+    {%- endfor %}
+)
+ORDER BY grouping_id
@@ -0,0 +1,36 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+{#-
+  Daily license counts per date field (establishment / expiry) and license-level dimension,
+  behind the timeseries_licenses tool. Any coarser interval (week, month, quarter, year, ...)
+  is the sum of its days: a license has a single date and a single value of each of these
+  dimensions (see tests/assert_rollup_columns_constant_per_license.sql), so it is counted in
+  exactly one daily bucket and the sums equal COUNT(DISTINCT license_sk).
+-#}
+{% set rollup_dimensions = [
+    'emirate_name_en',
+    'bl_status_en',
+    'bl_type_en',
+    'bl_legal_type_en'
+] %}
+
+WITH license_dates AS (
+    SELECT 'bl_est_date_d' AS date_field, bl_est_date_d AS day, license_sk, {{ rollup_dimensions | join(', ') }}
+    FROM {{ ref('dim_licenses') }}
+    UNION ALL
+    SELECT 'bl_exp_date_d' AS date_field, bl_exp_date_d AS day, license_sk, {{ rollup_dimensions | join(', ') }}
+    FROM {{ ref('dim_licenses') }}
+)
+
+SELECT
+    date_field,
+    day,
+    {{ rollup_dimensions | join(',\n    ') }},
+    COUNT(DISTINCT license_sk)                          AS license_count
+FROM license_dates
+GROUP BY ALL
+ORDER BY date_field, day
@@ -0,0 +1,32 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+{#-
+  Cell-to-license index over the geo_cell grid of dim_licenses, one record per cell and
+  license with coordinates. Sorted by cell, so the geo_licenses bounding-box filter, which
+  reads the cells of the rows covering the box, only touches the row groups of those rows.
+  nearest_licenses searches the same index ring by ring and ranks candidates with
+  haversine_km(), the great-circle distance on a sphere of the mean Earth radius.
+-#}
+{% set haversine_km %}
+CREATE OR REPLACE MACRO haversine_km(lat1, lon1, lat2, lon2) AS
+    2 * 6371.0088 * asin(sqrt(
+        pow(sin(radians(lat2 - lat1) / 2), 2)
+        + cos(radians(lat1)) * cos(radians(lat2)) * pow(sin(radians(lon2 - lon1) / 2), 2)
+    ));
+{% endset %}
+
+{% do run_query(haversine_km) %}
+
+SELECT DISTINCT
+    geo_cell,
+    -- row and column of the cell, kept for cheap range filters
+    geo_cell // 36000                                   AS cell_row,
+    geo_cell % 36000                                    AS cell_col,
+    license_sk
+FROM {{ ref('dim_licenses') }}
+WHERE geo_cell IS NOT NULL
+ORDER BY geo_cell, license_sk
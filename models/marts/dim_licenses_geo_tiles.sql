@@ -0,0 +1,66 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+{#-
+  License counts per web map tile (Web Mercator / slippy-map z/x/y numbering) for every zoom
+  level in tile_zooms, broken down by the same dimensions as dim_licenses_daily_rollup.
+  Backs the geo_license_clusters tool: a cluster is one tile, with its distinct license count
+  and the centroid of the distinct license locations in it (lat_sum / point_count).
+
+  Tiles are computed once at the finest zoom and shifted down for the coarser ones, which
+  gives the same numbers as lon_to_tile_x / lat_to_tile_y at each zoom because the scaling
+  is by powers of two. Locations outside the Web Mercator range are left out.
+-#}
+{% set tile_macros %}
+CREATE OR REPLACE MACRO lon_to_tile_x(lon, z) AS
+    CAST(floor((lon + 180) / 360 * pow(2, z)) AS BIGINT);
+
+CREATE OR REPLACE MACRO lat_to_tile_y(lat, z) AS
+    CAST(floor((1 - asinh(tan(radians(lat))) / pi()) / 2 * pow(2, z)) AS BIGINT);
+{% endset %}
+
+{% do run_query(tile_macros) %}
+
+{% set tile_zooms = range(3, 17) %}
+{% set max_zoom = tile_zooms | max %}
+{% set rollup_dimensions = [
+    'emirate_name_en',
+    'bl_status_en',
+    'bl_type_en',
+    'bl_legal_type_en'
+] %}
+
+WITH points AS (
+    SELECT DISTINCT
+        license_sk,
+        lat_dd,
+        lon_dd,
+        {{ rollup_dimensions | join(',\n        ') }}
+    FROM {{ ref('dim_licenses') }}
+    WHERE abs(lat_dd) < 85.0511 AND lon_dd >= -180 AND lon_dd < 180
+),
+
+finest AS (
+    SELECT
+        *,
+        lon_to_tile_x(lon_dd, {{ max_zoom }})           AS finest_x,
+        lat_to_tile_y(lat_dd, {{ max_zoom }})           AS finest_y
+    FROM points
+)
+
+SELECT
+    zoom::INTEGER                                       AS zoom,
+    finest_x >> ({{ max_zoom }} - zoom)                 AS tile_x,
+    finest_y >> ({{ max_zoom }} - zoom)                 AS tile_y,
+    {{ rollup_dimensions | join(',\n    ') }},
+    COUNT(DISTINCT license_sk)                          AS license_count,
+    COUNT(*)                                            AS point_count,
+    SUM(lat_dd)                                         AS lat_sum,
+    SUM(lon_dd)                                         AS lon_sum
+FROM finest
+CROSS JOIN (SELECT UNNEST({{ tile_zooms | list }}) AS zoom) AS zooms
+GROUP BY ALL
+ORDER BY zoom, tile_y, tile_x
@@ -0,0 +1,77 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+{#-
+  HyperLogLog sketches behind the `accuracy: approx` mode of aggregate_licenses, one per
+  combination of the seven cube dimensions (see dim_licenses_cube), stored sparsely as one
+  record per non-empty register.
+
+  A license maps to register hll_register(license_sk), the top 12 bits of the key (4096
+  registers), with rank hll_rank(license_sk), one plus the trailing zeros of its other 52
+  bits; license_sk is itself md5 output, so it serves as the hash. Sketches merge by taking
+  the max rank per register, so any filter or grouping on these dimensions is answered by
+  merging the matching cells, and hll_estimate() turns a merged sketch into a count whose
+  relative standard error is hll_error(): 1.04 / sqrt(4096), about 1.6%, for large counts.
+  Counts up to 3 * 4096 are estimated by linear counting (from the share of empty
+  registers) instead, where the raw estimate is biased; their error stays within 2.1%. Filters these cells cannot answer
+  (and timeseries_licenses) build the same registers from dim_licenses while scanning.
+-#}
+{% set hll_macros %}
+CREATE OR REPLACE MACRO hll_register(sk) AS CAST(sk >> 52 AS USMALLINT);
+
+-- One plus the trailing zeros of the low 52 bits: log2 of their lowest set bit, which is a
+-- power of two below 2^52 and therefore exact as a DOUBLE.
+CREATE OR REPLACE MACRO hll_rank(sk) AS CAST(
+    CASE
+        WHEN sk & 4503599627370495 = 0 THEN 53
+        ELSE log2(CAST(sk & 4503599627370495 AS BIGINT) & -CAST(sk & 4503599627370495 AS BIGINT)) + 1
+    END AS UTINYINT
+);
+
+-- registers: number of non-empty registers; inverse_sum: SUM(pow(0.5, rank)) over them.
+CREATE OR REPLACE MACRO hll_raw_estimate(registers, inverse_sum) AS
+    0.7213 / (1 + 1.079 / 4096) * 4096 * 4096 / (4096 - registers + inverse_sum);
+
+CREATE OR REPLACE MACRO hll_linear_estimate(registers) AS
+    CASE WHEN registers < 4096 THEN 4096 * ln(4096 / (4096 - registers)) END;
+
+CREATE OR REPLACE MACRO hll_estimate(registers, inverse_sum) AS CAST(round(
+    CASE
+        WHEN hll_linear_estimate(registers) <= 3 * 4096 THEN hll_linear_estimate(registers)
+        ELSE hll_raw_estimate(registers, inverse_sum)
+    END
+) AS BIGINT);
+
+-- Relative standard error of an estimate: linear counting up to 3 * 4096, HLL above.
+CREATE OR REPLACE MACRO hll_error(estimate) AS (
+    CASE
+        WHEN estimate <= 0 THEN 0.0
+        WHEN estimate <= 3 * 4096
+            THEN sqrt(4096 * (exp(estimate / 4096) - estimate / 4096 - 1)) / estimate
+        ELSE 1.04 / sqrt(4096)
+    END
+);
+{% endset %}
+
+{% do run_query(hll_macros) %}
+
+{% set cube_dimensions = [
+    'emirate_name_en',
+    'bl_status_en',
+    'bl_type_en',
+    'bl_legal_type_en',
+    'owner_nationality_en',
+    'relationship_type_en',
+    'owner_gender'
+] %}
+
+SELECT
+    {{ cube_dimensions | join(',\n    ') }},
+    hll_register(license_sk)                            AS register,
+    MAX(hll_rank(license_sk))                           AS rank
+FROM {{ ref('dim_licenses') }}
+GROUP BY ALL
+ORDER BY ALL
@@ -0,0 +1,88 @@
+{{ config(
+    materialized='table',
+    tags=["marts"],
+    contract={"enforced": True}
+) }}
+
+-- depends_on: {{ ref('dim_licenses_categorical_trigrams') }}
+-- depends_on: {{ ref('dim_licenses_ar_normalized') }}
+
+{#-
+  Trigram postings for the columns behind the `_like` substring filters. Postings point
+  at distinct column values rather than rows, so low-cardinality columns stay tiny and a
+  substring filter is resolved to a handful of candidate values before dim_licenses is
+  touched. The trigrams() macro comes from dim_licenses_categorical_trigrams.
+  Arabic (`_ar`) columns are indexed on their normalize_ar() form (see
+  dim_licenses_ar_normalized), so spelling variants share trigrams.
+  Rows are stored sorted by (field, trigram) so a lookup only reads the row groups of
+  the requested field and trigrams.
+-#}
+{% set text_fields = [
+    'emirate_name_en',
+    'emirate_name_ar',
+    'issuance_authority_en',
+    'issuance_authority_ar',
+    'issuance_authority_branch_en',
+    'issuance_authority_branch_ar',
+    'bl',
+    'bl_cbls',
+    'bl_name_ar',
+    'bl_name_en',
+    'bl_status_en',
+    'bl_status_ar',
+    'bl_legal_type_en',
+    'bl_legal_type_ar',
+    'bl_type_en',
+    'bl_type_ar',
+    'bl_full_address',
+    'parent_licence_license_number',
+    'parent_license_issuance_authority_en',
+    'parent_license_issuance_authority_ar',
+    'relationship_type_en',
+    'relationship_type_ar',
+    'owner_nationality_en',
+    'owner_nationality_ar',
+    'business_activity_code',
+    'business_activity_desc_en',
+    'business_activity_desc_ar'
+] %}
+
+{#-
+  Trigrams of a substring filter: unpadded, because the text may occur anywhere in the
+  value. Texts containing LIKE wildcards (% or _) get no trigrams, so the tools fall back
+  to matching them against the distinct values only.
+-#}
+{% set substring_trigrams %}
+CREATE OR REPLACE MACRO substring_trigrams(s) AS (
+    CASE
+        WHEN contains(s, '%') OR contains(s, '_') THEN []::VARCHAR[]
+        ELSE list_distinct(list_transform(
+            generate_series(1, length(s) - 2),
+            i -> substring(lower(s), i, 3)
+        ))
+    END
+);
+{% endset %}
+
+{% do run_query(substring_trigrams) %}
+
+WITH field_values AS (
+    SELECT DISTINCT field, value
+    FROM (
+        UNPIVOT (
+            SELECT {{ text_fields | join(', ') }}
+            FROM {{ ref('dim_licenses') }}
+        )
+        ON {{ text_fields | join(', ') }}
+        INTO NAME field VALUE value
+    )
+)
+
+SELECT
+    field,
+    UNNEST(trigrams(
+        CASE WHEN suffix(field, '_ar') THEN normalize_ar(value) ELSE value END
+    ))                                                  AS trigram,
+    value
+FROM field_values
+ORDER BY field, trigram
@@ -1,14 +1,36 @@
 {{ config(tags=["staging"], materialized='view') }}
 
+{#-
+  Preferred source: the Parquet dataset produced by scripts/land_licenses_parquet.py,
+  which parses the CSV once per file checksum. The raw CSV is still accepted as a fallback.
+
+  Both are read with the column names and types declared for this model in schema.yml
+  (the landing script reads the same declaration), so nothing is sniffed from the data
+  and a file whose columns differ fails here instead of further down the pipeline.
+-#}
+{%- if var('licenses_parquet', none) -%}
+
+SELECT *
+FROM read_parquet('{{ var("licenses_parquet") }}')
+
+{%- else -%}
+
 {%- if not var('licenses_file', none) -%}
-    {{ exceptions.raise_compiler_error("Please provide the licenses_file path using --vars '{\"licenses_file\": \"/path/to/your/licenses.csv\"}'") }}
+    {{ exceptions.raise_compiler_error("Please provide the landed dataset using --vars '{\"licenses_parquet\": \"landing/licenses/<sha256>/licenses.parquet\"}' (see scripts/land_licenses_parquet.py) or the raw CSV path using --vars '{\"licenses_file\": \"/path/to/your/licenses.csv\"}'") }}
 {%- endif -%}
 
 SELECT *
-FROM read_csv_auto(
+FROM read_csv(
        '{{ var("licenses_file") }}',
        delim='|',
        header=true,
-       normalize_names=true,
-       all_varchar=true
+       auto_detect=false,
+       dateformat='%d/%m/%Y',
+       columns={
+         {%- for column in model.columns.values() %}
+         '{{ column.name }}': '{{ column.data_type | upper }}'{{ ',' if not loop.last }}
+         {%- endfor %}
+       }
      )
+
+{%- endif %}
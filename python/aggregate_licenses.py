@@ -0,0 +1,135 @@
+"""
+aggregate_licenses tool: license counts grouped by up to two dimensions, with deep filtering.
+
+When the group_by dimensions plus the exact-match filters cover at most two of the seven
+cube dimensions and no other filter is set, the counts are read from the pre-aggregated
+dim_licenses_cube mart. Otherwise the statement is built like search_licenses (only
+supplied filters become predicates, see license_filters) and runs on dim_licenses.
+
+With accuracy='approx', calls the cube cannot answer get HyperLogLog estimates instead of
+exact distinct counts (see license_sketches): merged from dim_licenses_hll_sketches when
+every filter is an exact match on a cube dimension, otherwise built while scanning
+dim_licenses.
+"""
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from license_db import db
+from license_filters import bind_params, filter_shape, predicate, where_clause
+from license_policies import deny_early
+from license_queries import limit_clause
+from license_sketches import (APPROX, APPROX_ERROR_SQL, ESTIMATE_SQL, EXACT_ERROR_SQL, MERGE_REGISTERS_SQL,
+                              SCAN_REGISTERS_SQL)
+from result_cache import cached_tool
+
+# Same order as cube_dimensions in models/marts/dim_licenses_cube.sql; the order defines
+# the bits of grouping_id. Each dimension also has an exact-match filter of the same name.
+CUBE_DIMENSIONS = [
+    'emirate_name_en',
+    'bl_status_en',
+    'bl_type_en',
+    'bl_legal_type_en',
+    'owner_nationality_en',
+    'relationship_type_en',
+    'owner_gender',
+]
+
+METRICS_SQL = """
+  CASE WHEN strpos($metrics, 'count') > 0 THEN {count} END AS count,
+  CASE WHEN strpos($metrics, 'distinct_count') > 0 THEN {count} END AS distinct_count,
+  {error} AS error_bound"""
+
+ORDER_SQL = "ORDER BY count DESC"
+
+
+def group_columns(group_by: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (group_1, group_2) columns named in group_by; unknown names group nothing."""
+    parts = [part.strip() for part in group_by.split(',')] if group_by else []
+    columns = [part if part in CUBE_DIMENSIONS else None for part in parts[:2]]
+    columns += [None] * (2 - len(columns))
+    return columns[0], columns[1]
+
+
+def grouping_id(dimensions: FrozenSet[str]) -> int:
+    """GROUPING() bitmask of the cube grouping set that keeps exactly `dimensions`."""
+    return sum(1 << (len(CUBE_DIMENSIONS) - 1 - i)
+               for i, dim in enumerate(CUBE_DIMENSIONS) if dim not in dimensions)
+
+
+def _group_select(group_1: Optional[str], group_2: Optional[str]) -> str:
+    return (f"SELECT\n  {group_1 or 'NULL::VARCHAR'} AS group_1,\n"
+            f"  {group_2 or 'NULL::VARCHAR'} AS group_2,")
+
+
+@lru_cache(maxsize=4096)
+def build_cube_statement(shape: Tuple[str, ...], group_1: Optional[str], group_2: Optional[str]) -> str:
+    """Return the cube lookup for a group_by pair and exact-match filters on cube dimensions."""
+    dimensions = frozenset(shape) | {dim for dim in (group_1, group_2) if dim}
+    predicates = [f"grouping_id = {grouping_id(dimensions)}"]
+    predicates += [predicate(name) for name in shape]
+    return (
+        f"{_group_select(group_1, group_2)}{METRICS_SQL.format(count='license_count', error=EXACT_ERROR_SQL)}\n"
+        "FROM dim_licenses_cube\n"
+        f"WHERE {' AND '.join(predicates)}\n"
+        f"{ORDER_SQL}"
+    )
+
+
+@lru_cache(maxsize=4096)
+def build_statement(shape: Tuple[str, ...], group_1: Optional[str], group_2: Optional[str]) -> str:
+    """Return the full aggregate statement on dim_licenses for a filter shape."""
+    return (
+        f"{_group_select(group_1, group_2)}{METRICS_SQL.format(count='COUNT(DISTINCT license_sk)', error=EXACT_ERROR_SQL)}\n"
+        f"FROM dim_licenses_v1\n{where_clause(shape)}\n"
+        "GROUP BY group_1, group_2\n"
+        f"{ORDER_SQL}"
+    )
+
+
+@lru_cache(maxsize=4096)
+def build_approx_statement(shape: Tuple[str, ...], group_1: Optional[str], group_2: Optional[str]) -> str:
+    """Return the HyperLogLog aggregate statement for a filter shape, on the stored sketches if possible."""
+    if answerable_from_sketches(shape):
+        source, registers = 'dim_licenses_hll_sketches', MERGE_REGISTERS_SQL
+        where = f"WHERE {' AND '.join(predicate(name) for name in shape)}" if shape else ''
+    else:
+        source, registers, where = 'dim_licenses_v1', SCAN_REGISTERS_SQL, where_clause(shape)
+    return (
+        f"WITH registers AS (\n{_group_select(group_1, group_2)}\n  {registers}\n"
+        f"FROM {source}\n{where}\nGROUP BY ALL\n)\n"
+        f"SELECT\n  group_1,\n  group_2,{METRICS_SQL.format(count=ESTIMATE_SQL, error=APPROX_ERROR_SQL)}\n"
+        "FROM registers\n"
+        "GROUP BY group_1, group_2\n"
+        f"{ORDER_SQL}"
+    )
+
+
+def answerable_from_cube(shape: Tuple[str, ...], group_1: Optional[str], group_2: Optional[str]) -> bool:
+    """True when only cube-dimension exact filters are set and at most two dimensions are involved."""
+    if not set(shape) <= set(CUBE_DIMENSIONS):
+        return False
+    return len(set(shape) | {dim for dim in (group_1, group_2) if dim}) <= 2
+
+
+def answerable_from_sketches(shape: Tuple[str, ...]) -> bool:
+    """True when every supplied filter is an exact match on a cube dimension."""
+    return set(shape) <= set(CUBE_DIMENSIONS)
+
+
+@deny_early('aggregate_licenses')
+@cached_tool('aggregate_licenses')
+def aggregate_licenses(group_by: Optional[str] = None, metrics: str = 'count', accuracy: str = 'exact',
+                       page: int = 1, page_size: int = 20, **filters: Any) -> List[Dict[str, Any]]:
+    """Aggregate licenses; every filter parameter is optional and None means "not set"."""
+    shape = filter_shape(filters)
+    group_1, group_2 = group_columns(group_by)
+    if answerable_from_cube(shape, group_1, group_2):
+        builder = build_cube_statement
+    elif accuracy == APPROX:
+        builder = build_approx_statement
+    else:
+        builder = build_statement
+    return db.execute(
+        f"{builder(shape, group_1, group_2)}\n{limit_clause(page, page_size)}",
+        bind_params(shape, filters, metrics=metrics),
+    )
@@ -0,0 +1,22 @@
+"""
+categorical_license_values tool: the most frequent values of each categorical field,
+read from the precomputed dim_licenses_categorical_values table.
+"""
+from typing import Any, Dict, List, Optional
+
+from license_db import db
+from result_cache import cached_tool
+
+VALUES_SQL = """
+SELECT field, value
+FROM dim_licenses_categorical_values
+WHERE ($field IS NULL OR field = $field)
+  AND rank <= 500
+ORDER BY field, rank
+"""
+
+
+@cached_tool('categorical_license_values')
+def categorical_license_values(field: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return the values of one categorical field, or of all of them when field is None."""
+    return db.execute(VALUES_SQL, {'field': field})
@@ -0,0 +1,126 @@
+"""
+geo_license_clusters tool: license counts and centroids per web map tile inside a bounding box.
+
+A map at zoom z is clustered on the tiles of zoom z + CLUSTER_ZOOM_OFFSET, clamped to the
+zoom levels of dim_licenses_geo_tiles, so a screen-sized tile is split into an 8 x 8 grid of
+clusters. When the only filters are exact matches on the tile mart dimensions, the clusters
+are summed from dim_licenses_geo_tiles; otherwise they are computed from dim_licenses with the
+shared deep filters (see license_filters).
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from license_db import db
+from license_filters import bind_params, filter_shape, predicate, where_clause
+from license_grid import parse_bbox
+from license_queries import limit_clause
+
+CLUSTER_ZOOM_OFFSET = 3
+
+# Zoom levels stored in dim_licenses_geo_tiles (tile_zooms in the model).
+MIN_TILE_ZOOM = 3
+MAX_TILE_ZOOM = 16
+
+# Latitude limit of the Web Mercator projection used by the tiles.
+MAX_LATITUDE = 85.0511
+
+# Same dimensions as rollup_dimensions in models/marts/dim_licenses_geo_tiles.sql.
+TILE_DIMENSIONS = ('emirate_name_en', 'bl_status_en', 'bl_type_en', 'bl_legal_type_en')
+
+TILE_BBOX_SQL = """tile_x BETWEEN lon_to_tile_x($min_lon, $tile_zoom) AND lon_to_tile_x($max_lon, $tile_zoom)
+  AND tile_y BETWEEN lat_to_tile_y($max_lat, $tile_zoom) AND lat_to_tile_y($min_lat, $tile_zoom)"""
+
+TILES_SELECT_SQL = """
+SELECT
+  zoom,
+  tile_x,
+  tile_y,
+  SUM(license_count)::BIGINT AS count,
+  SUM(lat_sum) / SUM(point_count) AS lat,
+  SUM(lon_sum) / SUM(point_count) AS lon
+FROM dim_licenses_geo_tiles
+"""
+
+POINTS_SQL = """
+WITH points AS (
+  SELECT DISTINCT license_sk, lat_dd, lon_dd
+  FROM dim_licenses_v1
+  {where}
+),
+tiles AS (
+  SELECT
+    $tile_zoom::INTEGER AS zoom,
+    lon_to_tile_x(lon_dd, $tile_zoom) AS tile_x,
+    lat_to_tile_y(lat_dd, $tile_zoom) AS tile_y,
+    license_sk,
+    lat_dd,
+    lon_dd
+  FROM points
+)
+SELECT
+  zoom,
+  tile_x,
+  tile_y,
+  COUNT(DISTINCT license_sk) AS count,
+  AVG(lat_dd) AS lat,
+  AVG(lon_dd) AS lon
+FROM tiles
+"""
+
+IN_PROJECTION_SQL = "abs(lat_dd) < 85.0511 AND lon_dd >= -180 AND lon_dd < 180"
+
+GROUP_SQL = """GROUP BY zoom, tile_x, tile_y
+ORDER BY count DESC, tile_y, tile_x"""
+
+
+def tile_zoom(zoom: int) -> int:
+    """Zoom level of the cluster tiles for a map zoom level."""
+    return min(max(zoom + CLUSTER_ZOOM_OFFSET, MIN_TILE_ZOOM), MAX_TILE_ZOOM)
+
+
+def bbox_params(bbox: str) -> Dict[str, float]:
+    """Bind parameters for TILE_BBOX_SQL, with latitudes clamped to the projection."""
+    min_lon, min_lat, max_lon, max_lat = parse_bbox(bbox)
+    return {
+        'min_lon': min_lon,
+        'min_lat': min(max(min_lat, -MAX_LATITUDE), MAX_LATITUDE),
+        'max_lon': max_lon,
+        'max_lat': min(max(max_lat, -MAX_LATITUDE), MAX_LATITUDE),
+    }
+
+
+@lru_cache(maxsize=4096)
+def build_tiles_statement(shape: Tuple[str, ...], with_bbox: bool) -> str:
+    """Return the cluster statement on dim_licenses_geo_tiles for a filter shape."""
+    predicates = ["zoom = $tile_zoom"] + [predicate(name) for name in shape]
+    if with_bbox:
+        predicates.append(TILE_BBOX_SQL)
+    return f"{TILES_SELECT_SQL}WHERE {' AND '.join(predicates)}\n{GROUP_SQL}"
+
+
+@lru_cache(maxsize=4096)
+def build_statement(shape: Tuple[str, ...], with_bbox: bool) -> str:
+    """Return the cluster statement on dim_licenses for a filter shape."""
+    points = POINTS_SQL.format(where=where_clause(shape, (IN_PROJECTION_SQL,)))
+    tiles_where = f"WHERE {TILE_BBOX_SQL}\n" if with_bbox else ""
+    return f"{points}{tiles_where}{GROUP_SQL}"
+
+
+def answerable_from_tiles(shape: Tuple[str, ...]) -> bool:
+    """True when every supplied filter is an exact match on a dimension of the tile mart."""
+    return set(shape) <= set(TILE_DIMENSIONS)
+
+
+def geo_license_clusters(bbox: Optional[str] = None, zoom: int = 8, page: int = 1,
+                         page_size: int = 500, **filters: Any) -> List[Dict[str, Any]]:
+    """Cluster licenses on map tiles; every filter parameter is optional and None means "not set"."""
+    shape = filter_shape(filters)
+    with_bbox = bbox is not None
+    extra = dict(tile_zoom=tile_zoom(zoom))
+    if with_bbox:
+        extra.update(bbox_params(bbox))
+    if answerable_from_tiles(shape):
+        statement = build_tiles_statement(shape, with_bbox)
+    else:
+        statement = build_statement(shape, with_bbox)
+    return db.execute(f"{statement}\n{limit_clause(page, page_size)}", bind_params(shape, filters, **extra))
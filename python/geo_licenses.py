@@ -0,0 +1,40 @@
+"""
+geo_licenses tool: license search by bounding box plus the shared deep filters.
+
+Built the same way as search_licenses: only supplied filters become predicates, and the
+statement is cached per filter shape and paging mode. The bounding box is resolved to grid
+cells first (see license_grid), so only licenses in the covering cells are checked.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from license_db import db
+from license_filters import bind_params, filter_shape, where_clause
+from license_grid import bbox_filter
+from license_policies import columns_sql, deny_early
+from license_queries import ORDER_BY_SQL, license_records, license_select_sql, page_clause
+from result_cache import cached_tool
+
+
+@lru_cache(maxsize=4096)
+def build_statement(columns: str, shape: Tuple[str, ...], extra: Tuple[str, ...], limit_sql: str) -> str:
+    """Return the full geo statement for a select list, filter shape, bbox/seek predicates and paging mode."""
+    return f"{license_select_sql(columns)}{where_clause(shape, extra)}\n{ORDER_BY_SQL}\n{limit_sql}"
+
+
+@deny_early('geo_licenses')
+@cached_tool('geo_licenses')
+def geo_licenses(bbox: Optional[str] = None, page: int = 1, page_size: int = 20,
+                 cursor: Optional[str] = None, **filters: Any) -> List[Dict[str, Any]]:
+    """Search licenses inside an optional bounding box; None means "not set" for every filter."""
+    shape = filter_shape(filters)
+    seek, limit_sql, paging = page_clause(cursor, page, page_size)
+    extra = seek
+    if bbox is not None:
+        bbox_sql, bbox_binds = bbox_filter(bbox)
+        extra = (bbox_sql,) + seek
+        paging.update(bbox_binds)
+    return license_records(db.execute(
+        build_statement(columns_sql('geo_licenses'), shape, extra, limit_sql),
+        bind_params(shape, filters, **paging),
+    ))
@@ -0,0 +1,13 @@
+"""
+license_cache_stats tool: hit/miss metrics of the license tool result cache (result_cache)
+and the prepared statement counters of the connection pool (license_db).
+"""
+from typing import Any, Dict
+
+from license_db import db
+from result_cache import cache_stats
+
+
+def license_cache_stats() -> Dict[str, Any]:
+    """Return the result cache and prepared statement counters of this server process."""
+    return dict(cache_stats(), prepared_statements=db.statement_stats())
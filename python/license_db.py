@@ -0,0 +1,358 @@
+"""
+Pool of read-only DuckDB connections for the license tools.
+
+`db.execute(sql, params)` has the same signature and result shape as mxcp.runtime.db, but
+runs each statement on one of LICENSES_POOL_SIZE cursors of a read-only connection to
+db-prod.duckdb (MXCP_DUCKDB_PATH when set), so concurrent tool calls run in parallel
+instead of queueing on the server's single connection. A call waits only when every
+cursor is busy.
+
+DuckDB shares one set of worker threads between all cursors of a database. The per-query
+budget LICENSES_QUERY_THREADS sets that `threads` setting: a statement runs on its calling
+thread plus at most LICENSES_QUERY_THREADS - 1 workers, shared with the statements running
+next to it. It defaults to the CPU count divided by the pool size.
+
+scripts/build_and_swap.py builds into a new file and then points the db-prod.duckdb
+symlink at it. Every call resolves the symlink; when it points somewhere new, the pool
+opens the new file for this and all later calls, and closes the old one once the calls
+still running on it have finished. The server keeps running throughout. Before the swap
+the script points db-prod.duckdb.next at the new build for a few seconds; a call that sees
+it opens that file in the background and prepares the pool's most recently used statements
+on its cursors, so the first calls after the swap find a warm database.
+
+Statements are prepared once per cursor (PREPARE) and then only executed (EXECUTE), so a
+repeated call skips parsing, binding and planning. The tools build one statement text per
+filter shape, so each shape gets its own prepared statement. EXECUTE takes literal values,
+which sql_literal() renders; other value types fall back to a plain parameterized execute.
+DuckDB only reuses the plan when every value has exactly the type it inferred for the
+parameter, so a parameter the statement casts ($x::DATE, TRY_CAST($x AS ...)) gets its
+literal cast the same way. Each cursor keeps its MAX_PREPARED most recently used
+statements. A text is only prepared once the pool has seen it before: page sizes and
+offsets are part of the text, and preparing every page a caller fetches once would evict
+the statements that do repeat. A first sighting runs as a plain parameterized execute.
+A call takes the free cursor that most recently ran its statement text, or else the most
+recently returned one, so a repeated statement finds itself prepared instead of being
+prepared again on every cursor in turn.
+The planning time saved (the time the PREPARE took, for every reuse) is reported by
+license_cache_stats.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import duckdb
+from pandas import NaT
+
+from mxcp.runtime import on_shutdown
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE_ENV = 'LICENSES_POOL_SIZE'
+QUERY_THREADS_ENV = 'LICENSES_QUERY_THREADS'
+DEFAULT_POOL_SIZE = 4
+MAX_PREPARED = 256
+MAX_SEEN = 4 * MAX_PREPARED
+NEXT_SUFFIX = '.next'
+
+BIGINT_MIN, BIGINT_MAX = -2 ** 63, 2 ** 63 - 1
+UBIGINT_MAX = 2 ** 64 - 1
+
+# A parameter cast in the statement text: $name::TYPE, CAST($name AS TYPE) or TRY_CAST($name AS TYPE).
+_PARAMETER_CAST = re.compile(r"\$(\w+)::(\w+)|\b(TRY_CAST|CAST)\(\s*\$(\w+)\s+AS\s+(\w+)\s*\)", re.IGNORECASE)
+
+DATABASE_PATH = os.environ.get('MXCP_DUCKDB_PATH') or str(Path(__file__).resolve().parent.parent / 'db-prod.duckdb')
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f"{name} must be a positive integer, got {value!r}")
+    return int(value)
+
+
+def sql_literal(value: Any) -> Optional[str]:
+    """Render a parameter value as a SQL literal, or None for types EXECUTE is not used for."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        if BIGINT_MIN <= value <= BIGINT_MAX:
+            return str(value)
+        return f"{value}::UBIGINT" if 0 <= value <= UBIGINT_MAX else None
+    if isinstance(value, float):
+        return f"'{value!r}'::DOUBLE"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, datetime):
+        return None if value.tzinfo else f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"DATE '{value.isoformat()}'"
+    return None
+
+
+def parameter_casts(query: str) -> Dict[str, str]:
+    """
+    Return {parameter: cast template} for the parameters `query` casts to one type, e.g.
+    {'bl_est_date_from': 'CAST({} AS DATE)'}. Parameters cast in different ways are left out.
+    """
+    casts: Dict[str, str] = {}
+    ambiguous = set()
+    for match in _PARAMETER_CAST.finditer(query):
+        if match.group(1):
+            name, template = match.group(1), f"CAST({{}} AS {match.group(2)})"
+        else:
+            name, template = match.group(4), f"{match.group(3).upper()}({{}} AS {match.group(5)})"
+        if casts.setdefault(name, template) != template:
+            ambiguous.add(name)
+    return {name: template for name, template in casts.items() if name not in ambiguous}
+
+
+class _Cursor:
+    """A pooled cursor and the statements prepared on it, least recently used first."""
+
+    def __init__(self, connection: duckdb.DuckDBPyConnection):
+        self.connection = connection
+        # statement text -> (prepared name, seconds the PREPARE took, parameter casts)
+        self.statements: 'OrderedDict[str, Tuple[str, float, Dict[str, str]]]' = OrderedDict()
+        self.prepared = 0
+
+
+class _Database:
+    """One database file opened read-only, with its cursors and the calls using them."""
+
+    def __init__(self, path: str, size: int, query_threads: int):
+        self.path = path
+        self.connection = duckdb.connect(path, read_only=True)
+        self.connection.execute(f"SET threads = {query_threads}")
+        # The free cursors, most recently returned last.
+        self.cursors = [_Cursor(self.connection.cursor()) for _ in range(size)]
+        self._free = threading.Condition()
+        self.in_flight = 0
+        self.retired = False
+
+    def take(self, query: Optional[str]) -> _Cursor:
+        """Wait for a free cursor; the latest returned one holding `query` prepared, else the latest returned."""
+        with self._free:
+            while not self.cursors:
+                self._free.wait()
+            for i in range(len(self.cursors) - 1, -1, -1):
+                if query in self.cursors[i].statements:
+                    return self.cursors.pop(i)
+            return self.cursors.pop()
+
+    def give_back(self, cursor: _Cursor) -> None:
+        with self._free:
+            self.cursors.append(cursor)
+            self._free.notify()
+
+    def close(self) -> None:
+        for cursor in self.cursors:
+            cursor.connection.close()
+        self.connection.close()
+
+
+class ConnectionPool:
+    """Fixed set of cursors on the file db-prod.duckdb resolves to, one call at a time each."""
+
+    def __init__(self, path: str, size: int, query_threads: int):
+        self.path = path
+        self.size = size
+        self.query_threads = query_threads
+        self._database: Optional[_Database] = None
+        # The build db-prod.duckdb.next points at, opened and warmed ahead of the swap.
+        self._next: Optional[_Database] = None
+        self._warming = False
+        # Statement texts prepared or reused most recently, across all cursors.
+        self._hot: 'OrderedDict[str, None]' = OrderedDict()
+        # Statement texts executed recently, prepared or not; a text is prepared on its second sighting.
+        self._seen: 'OrderedDict[str, None]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._prepared = 0
+        self._reused = 0
+        self._planning_saved = 0.0
+
+    def _retire(self, database: _Database) -> None:
+        database.retired = True
+        if database.in_flight == 0:
+            database.close()
+
+    def _checkout(self) -> _Database:
+        # The resolved path, not self.path: DuckDB caches open databases by path, and the
+        # old file must stay open until its calls have drained.
+        path = os.path.realpath(self.path)
+        with self._lock:
+            if self._database is None or self._database.path != path:
+                old = self._database
+                if self._next is not None and self._next.path == path:
+                    self._database, self._next = self._next, None
+                else:
+                    self._database = _Database(path, self.size, self.query_threads)
+                if old is not None:
+                    self._retire(old)
+            self._database.in_flight += 1
+            database = self._database
+        self._warm_next()
+        return database
+
+    def _warm_next(self) -> None:
+        """Start warming the build db-prod.duckdb.next points at, unless it is open already."""
+        link = self.path + NEXT_SUFFIX
+        if not os.path.islink(link):
+            return
+        path = os.path.realpath(link)
+        with self._lock:
+            if self._warming or path == self._database.path or (self._next is not None and self._next.path == path):
+                return
+            self._warming = True
+            statements = list(self._hot)
+        threading.Thread(target=self._open_next, args=(path, statements), daemon=True).start()
+
+    def _open_next(self, path: str, statements: List[str]) -> None:
+        """Open `path` and prepare `statements` on each of its cursors, then hold it for the swap."""
+        database = None
+        try:
+            database = _Database(path, self.size, self.query_threads)
+            for cursor in database.cursors:
+                for query in statements:
+                    try:
+                        self._prepare_new(cursor, query)
+                    except duckdb.Error:
+                        # The statement no longer binds on the new build; it is prepared on first use, if ever.
+                        pass
+        except duckdb.Error as e:
+            logger.warning(f"Could not warm {path}: {e}")
+            database = None
+        finally:
+            with self._lock:
+                self._warming = False
+                if database is not None and self._database is not None and self._database.path == path:
+                    # The swap happened while warming and a call opened the file itself.
+                    database, stale = None, database
+                else:
+                    stale, self._next = self._next, database
+            if stale is not None:
+                stale.close()
+
+    def _checkin(self, database: _Database) -> None:
+        with self._lock:
+            database.in_flight -= 1
+            if database.retired and database.in_flight == 0:
+                database.close()
+
+    def version(self) -> Tuple[str, int]:
+        """The file db-prod.duckdb resolves to and its modification time; changes with every rebuild."""
+        path = os.path.realpath(self.path)
+        return path, os.stat(path).st_mtime_ns
+
+    @contextmanager
+    def cursor(self, query: Optional[str] = None) -> Iterator[_Cursor]:
+        """A free cursor for one call, preferably one that has `query` prepared."""
+        database = self._checkout()
+        try:
+            cursor = database.take(query)
+            try:
+                yield cursor
+            finally:
+                database.give_back(cursor)
+        finally:
+            self._checkin(database)
+
+    def _seen_before(self, query: str) -> bool:
+        """Record a sighting of `query`; True when it was already among the MAX_SEEN most recent texts."""
+        with self._lock:
+            if query in self._seen:
+                self._seen.move_to_end(query)
+                return True
+            self._seen[query] = None
+            if len(self._seen) > MAX_SEEN:
+                self._seen.popitem(last=False)
+            return False
+
+    def _prepare(self, cursor: _Cursor, query: str) -> Tuple[str, Dict[str, str]]:
+        """Return the name and parameter casts of `query` prepared on `cursor`, preparing it on first use."""
+        with self._lock:
+            self._hot[query] = None
+            self._hot.move_to_end(query)
+            if len(self._hot) > MAX_PREPARED:
+                self._hot.popitem(last=False)
+        entry = cursor.statements.get(query)
+        if entry is not None:
+            cursor.statements.move_to_end(query)
+            with self._lock:
+                self._reused += 1
+                self._planning_saved += entry[1]
+            return entry[0], entry[2]
+        return self._prepare_new(cursor, query)
+
+    def _prepare_new(self, cursor: _Cursor, query: str) -> Tuple[str, Dict[str, str]]:
+        """PREPARE `query` on `cursor`, evicting its least recently used statement when full."""
+        cursor.prepared += 1
+        name = f"license_statement_{cursor.prepared}"
+        start = time.perf_counter()
+        cursor.connection.execute(f"PREPARE {name} AS {query}")
+        casts = parameter_casts(query)
+        cursor.statements[query] = (name, time.perf_counter() - start, casts)
+        if len(cursor.statements) > MAX_PREPARED:
+            evicted = cursor.statements.popitem(last=False)[1][0]
+            cursor.connection.execute(f"DEALLOCATE {evicted}")
+        with self._lock:
+            self._prepared += 1
+        return name, casts
+
+    def execute(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run a statement on a free cursor; rows as dicts, like mxcp.runtime.db.execute."""
+        params = params or {}
+        literals = {name: sql_literal(value) for name, value in params.items()}
+        with self.cursor(query) as cursor:
+            seen = self._seen_before(query)
+            if None in literals.values() or not (seen or query in cursor.statements):
+                result = cursor.connection.execute(query, params)
+            else:
+                name, casts = self._prepare(cursor, query)
+                arguments = ', '.join(
+                    f'"{param}" := {casts[param].format(literal) if param in casts else literal}'
+                    for param, literal in literals.items()
+                )
+                result = cursor.connection.execute(f"EXECUTE {name}({arguments})" if arguments else f"EXECUTE {name}")
+            return result.fetchdf().replace({NaT: None}).to_dict('records')
+
+    def statement_stats(self) -> Dict[str, Any]:
+        """Prepared statement counters since the server started, across all builds."""
+        with self._lock:
+            return {
+                'prepared': self._prepared,
+                'reused': self._reused,
+                'planning_ms_saved': round(self._planning_saved * 1000, 3),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._database is not None:
+                self._retire(self._database)
+                self._database = None
+            if self._next is not None:
+                self._next.close()
+                self._next = None
+
+
+_pool_size = _env_int(POOL_SIZE_ENV, DEFAULT_POOL_SIZE)
+db = ConnectionPool(
+    DATABASE_PATH,
+    size=_pool_size,
+    query_threads=_env_int(QUERY_THREADS_ENV, max(1, (os.cpu_count() or 1) // _pool_size)),
+)
+
+
+@on_shutdown
+def close_pool() -> None:
+    db.close()
@@ -0,0 +1,162 @@
+"""
+Query building for the license tools.
+
+The SQL tools used to carry ~64 catch-all predicates of the form `($x IS NULL OR col = $x)`,
+which DuckDB evaluates on every row whichever filters the caller actually set. That keeps
+filters out of the scan and defeats row-group (zone-map) pruning. Here only the predicates
+for supplied parameters are emitted, and the generated WHERE clause is cached per
+filter-combination shape, so repeated calls with the same set of filters reuse it.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple
+
+# Substring filters are resolved through the trigram postings in dim_licenses_text_trigrams:
+# the values holding every trigram of the text are re-checked with ILIKE, and only those
+# values are matched against dim_licenses. Texts without trigrams (shorter than three
+# characters, or containing LIKE wildcards) check ILIKE against the field's distinct values.
+# {text} and {value} are the filter text and the stored value, normalized for Arabic columns.
+LIKE_PREDICATE = """{column} IN (
+    SELECT value
+    FROM dim_licenses_text_trigrams
+    WHERE field = '{column}'
+      AND (len(substring_trigrams({text})) = 0
+           OR trigram IN (SELECT UNNEST(substring_trigrams({text}))))
+    GROUP BY value
+    HAVING (len(substring_trigrams({text})) = 0 OR COUNT(*) = len(substring_trigrams({text})))
+       AND {value} ILIKE '%' || {text} || '%'
+  )"""
+
+# Arabic columns match through their normalize_ar() form (see dim_licenses_ar_normalized),
+# so alef/hamza variants, taa marbuta, tatweel and diacritics do not cause misses.
+EQ_AR_PREDICATE = """{column} IN (
+    SELECT value
+    FROM dim_licenses_ar_normalized
+    WHERE field = '{column}' AND value_norm = normalize_ar(${param})
+  )"""
+
+# ENUM columns of dim_licenses (see the enum types in models/marts/dim_licenses.sql). The
+# value is cast to the column's type so the comparison runs on ENUM codes; comparing with
+# a plain string would cast every stored value to text instead. Unknown values become NULL
+# and match nothing, as before.
+EQ_ENUM_PREDICATE = "{column} = TRY_CAST(${param} AS {column}_enum)"
+
+# SQL template per filter kind; {column} and {param} are filled in from FILTERS.
+PREDICATES = {
+    'eq': "{column} = ${param}",
+    'eq_enum': EQ_ENUM_PREDICATE,
+    'like': LIKE_PREDICATE.replace('{text}', '${param}').replace('{value}', 'value'),
+    'eq_ar': EQ_AR_PREDICATE,
+    'like_ar': LIKE_PREDICATE.replace('{text}', 'normalize_ar(${param})').replace('{value}', 'normalize_ar(value)'),
+    'date_from': "{column} >= ${param}::DATE",
+    'date_to': "{column} <= ${param}::DATE",
+    'min': "{column} >= ${param}::DOUBLE",
+    'max': "{column} <= ${param}::DOUBLE",
+}
+
+# (parameter, column, kind) for every filter shared by the license tools, in the
+# order the predicates appear in the generated SQL.
+FILTERS = [
+    ('emirate_name_en', 'emirate_name_en', 'eq_enum'),
+    ('emirate_name_en_like', 'emirate_name_en', 'like'),
+    ('emirate_name_ar', 'emirate_name_ar', 'eq_ar'),
+    ('emirate_name_ar_like', 'emirate_name_ar', 'like_ar'),
+    ('issuance_authority_en', 'issuance_authority_en', 'eq'),
+    ('issuance_authority_en_like', 'issuance_authority_en', 'like'),
+    ('issuance_authority_ar', 'issuance_authority_ar', 'eq_ar'),
+    ('issuance_authority_ar_like', 'issuance_authority_ar', 'like_ar'),
+    ('issuance_authority_branch_en', 'issuance_authority_branch_en', 'eq'),
+    ('issuance_authority_branch_en_like', 'issuance_authority_branch_en', 'like'),
+    ('issuance_authority_branch_ar', 'issuance_authority_branch_ar', 'eq_ar'),
+    ('issuance_authority_branch_ar_like', 'issuance_authority_branch_ar', 'like_ar'),
+    ('bl_num', 'bl', 'eq'),
+    ('bl_num_like', 'bl', 'like'),
+    ('bl_cbls_num', 'bl_cbls', 'eq'),
+    ('bl_cbls_num_like', 'bl_cbls', 'like'),
+    ('bl_name_ar', 'bl_name_ar', 'eq_ar'),
+    ('bl_name_ar_like', 'bl_name_ar', 'like_ar'),
+    ('bl_name_en', 'bl_name_en', 'eq'),
+    ('bl_name_en_like', 'bl_name_en', 'like'),
+    ('bl_est_date_from', 'bl_est_date_d', 'date_from'),
+    ('bl_est_date_to', 'bl_est_date_d', 'date_to'),
+    ('bl_exp_date_from', 'bl_exp_date_d', 'date_from'),
+    ('bl_exp_date_to', 'bl_exp_date_d', 'date_to'),
+    ('bl_status_en', 'bl_status_en', 'eq_enum'),
+    ('bl_status_en_like', 'bl_status_en', 'like'),
+    ('bl_status_ar', 'bl_status_ar', 'eq_ar'),
+    ('bl_status_ar_like', 'bl_status_ar', 'like_ar'),
+    ('bl_legal_type_en', 'bl_legal_type_en', 'eq_enum'),
+    ('bl_legal_type_en_like', 'bl_legal_type_en', 'like'),
+    ('bl_legal_type_ar', 'bl_legal_type_ar', 'eq_ar'),
+    ('bl_legal_type_ar_like', 'bl_legal_type_ar', 'like_ar'),
+    ('bl_type_en', 'bl_type_en', 'eq_enum'),
+    ('bl_type_en_like', 'bl_type_en', 'like'),
+    ('bl_type_ar', 'bl_type_ar', 'eq_ar'),
+    ('bl_type_ar_like', 'bl_type_ar', 'like_ar'),
+    ('bl_full_address', 'bl_full_address', 'eq'),
+    ('bl_full_address_like', 'bl_full_address', 'like'),
+    ('license_latitude_min', 'lat_dd', 'min'),
+    ('license_latitude_max', 'lat_dd', 'max'),
+    ('license_longitude_min', 'lon_dd', 'min'),
+    ('license_longitude_max', 'lon_dd', 'max'),
+    ('license_branch_flag', 'license_branch_flag', 'eq'),
+    ('parent_licence_license_number', 'parent_licence_license_number', 'eq'),
+    ('parent_licence_license_number_like', 'parent_licence_license_number', 'like'),
+    ('parent_license_issuance_authority_en', 'parent_license_issuance_authority_en', 'eq'),
+    ('parent_license_issuance_authority_en_like', 'parent_license_issuance_authority_en', 'like'),
+    ('parent_license_issuance_authority_ar', 'parent_license_issuance_authority_ar', 'eq_ar'),
+    ('parent_license_issuance_authority_ar_like', 'parent_license_issuance_authority_ar', 'like_ar'),
+    ('relationship_type_en', 'relationship_type_en', 'eq_enum'),
+    ('relationship_type_en_like', 'relationship_type_en', 'like'),
+    ('relationship_type_ar', 'relationship_type_ar', 'eq_ar'),
+    ('relationship_type_ar_like', 'relationship_type_ar', 'like_ar'),
+    ('owner_nationality_en', 'owner_nationality_en', 'eq'),
+    ('owner_nationality_en_like', 'owner_nationality_en', 'like'),
+    ('owner_nationality_ar', 'owner_nationality_ar', 'eq_ar'),
+    ('owner_nationality_ar_like', 'owner_nationality_ar', 'like_ar'),
+    ('owner_gender', 'owner_gender', 'eq_enum'),
+    ('business_activity_code', 'business_activity_code', 'eq'),
+    ('business_activity_code_like', 'business_activity_code', 'like'),
+    ('business_activity_desc_en', 'business_activity_desc_en', 'eq'),
+    ('business_activity_desc_en_like', 'business_activity_desc_en', 'like'),
+    ('business_activity_desc_ar', 'business_activity_desc_ar', 'eq_ar'),
+    ('business_activity_desc_ar_like', 'business_activity_desc_ar', 'like_ar'),
+]
+
+FILTER_NAMES = tuple(name for name, _, _ in FILTERS)
+_FILTERS_BY_NAME = {name: (column, kind) for name, column, kind in FILTERS}
+
+
+def filter_shape(params: Dict[str, Any]) -> Tuple[str, ...]:
+    """
+    Return the names of the filters the caller supplied, in FILTERS order.
+
+    Only None counts as "not supplied", exactly like the `$x IS NULL` guards this replaces,
+    so an empty string still filters.
+    """
+    return tuple(name for name in FILTER_NAMES if params.get(name) is not None)
+
+
+def predicate(name: str) -> str:
+    """Return the SQL predicate of one filter, reading its value from $<name>."""
+    column, kind = _FILTERS_BY_NAME[name]
+    return PREDICATES[kind].format(column=column, param=name)
+
+
+@lru_cache(maxsize=4096)
+def where_clause(shape: Tuple[str, ...], extra: Tuple[str, ...] = ()) -> str:
+    """
+    Build the WHERE clause for a filter shape, followed by any tool-specific `extra`
+    predicates. Yields an empty string when there is nothing to filter on.
+    """
+    predicates = [predicate(name) for name in shape]
+    predicates.extend(extra)
+    if not predicates:
+        return ''
+    return 'WHERE ' + '\n  AND '.join(predicates)
+
+
+def bind_params(shape: Iterable[str], params: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    """Collect the values for the placeholders a statement built from `shape` references."""
+    bound = {name: params[name] for name in shape}
+    bound.update(extra)
+    return bound
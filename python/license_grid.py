@@ -0,0 +1,79 @@
+"""
+Spatial grid shared by the geo license tools.
+
+dim_licenses.geo_cell numbers 0.01 degree cells as row * 36000 + column, counting rows
+from -90 latitude and columns from -180 longitude (see the geo_cell macro in
+models/marts/dim_licenses.sql). dim_licenses_geo_cells maps each cell to its licenses, so
+a bounding box is first resolved to the rows and columns of the cells covering it.
+geo_cell is only defined for coordinates in [-90, 90] x [-180, 180); boxes reaching outside
+that range are checked against the coordinates directly.
+"""
+import math
+from typing import Dict, Tuple
+
+CELLS_PER_DEGREE = 100
+GRID_COLUMNS = 360 * CELLS_PER_DEGREE
+
+
+def cell_row(lat: float) -> int:
+    """Grid row containing latitude lat; same arithmetic as the geo_cell macro."""
+    return math.floor((lat + 90) * CELLS_PER_DEGREE)
+
+
+def cell_col(lon: float) -> int:
+    """Grid column containing longitude lon; same arithmetic as the geo_cell macro."""
+    return math.floor((lon + 180) * CELLS_PER_DEGREE)
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Split "min_lon,min_lat,max_lon,max_lat" into floats; raises ValueError if malformed."""
+    parts = bbox.split(',')
+    try:
+        bounds = tuple(float(part) for part in parts[:4])
+    except ValueError:
+        bounds = ()
+    if len(bounds) != 4 or not all(math.isfinite(b) for b in bounds):
+        raise ValueError(f"Invalid bbox: {bbox!r} (expected 'min_lon,min_lat,max_lon,max_lat')")
+    return bounds
+
+
+def inside_grid(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> bool:
+    """True when the box lies where geo_cell is defined, [-90, 90] x [-180, 180)."""
+    return -90 <= min_lat and max_lat <= 90 and -180 <= min_lon and max_lon < 180
+
+
+# The exact box; used alone when it reaches outside the grid.
+BBOX_SQL = """(
+    lon_dd >= $min_lon AND
+    lat_dd >= $min_lat AND
+    lon_dd <= $max_lon AND
+    lat_dd <= $max_lat
+  )"""
+
+# Licenses in the grid cells covering the box, re-checked against the exact box.
+BBOX_CELLS_SQL = """(
+    license_sk IN (
+      SELECT license_sk FROM dim_licenses_geo_cells
+      WHERE cell_row BETWEEN $min_cell_row::BIGINT AND $max_cell_row::BIGINT
+        AND cell_col BETWEEN $min_cell_col::BIGINT AND $max_cell_col::BIGINT
+    ) AND
+    lon_dd >= $min_lon AND
+    lat_dd >= $min_lat AND
+    lon_dd <= $max_lon AND
+    lat_dd <= $max_lat
+  )"""
+
+
+def bbox_filter(bbox: str) -> Tuple[str, Dict[str, float]]:
+    """Predicate and bind parameters for a bounding box filter on dim_licenses."""
+    min_lon, min_lat, max_lon, max_lat = parse_bbox(bbox)
+    params = {'min_lon': min_lon, 'min_lat': min_lat, 'max_lon': max_lon, 'max_lat': max_lat}
+    if not inside_grid(min_lon, min_lat, max_lon, max_lat):
+        return BBOX_SQL, params
+    params.update(
+        min_cell_row=cell_row(min_lat),
+        max_cell_row=cell_row(max_lat),
+        min_cell_col=cell_col(min_lon),
+        max_cell_col=cell_col(max_lon),
+    )
+    return BBOX_CELLS_SQL, params
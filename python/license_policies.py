@@ -0,0 +1,129 @@
+"""
+Output policies of the row-returning license tools, applied in the SELECT list.
+
+search_licenses, geo_licenses and nearest_licenses mask (mask_fields) or drop
+(filter_fields) columns for guests in their `policies.output`, which MXCP applies to the
+fetched rows. columns_sql() reads those policies from the tool definition and builds the
+select list for the caller's role with the same effect: a masked column is selected as the
+constant '****' (the value mask_fields writes) and a dropped one as NULL, so neither is
+read from dim_licenses_v1. MXCP still applies the policies to the result, which then
+changes nothing.
+
+Only conditions of the form `user.role == '<role>'` are applied here; the select list of a
+policy with any other condition is left as it is, and MXCP alone enforces it.
+
+@deny_early(tool) moves `deny` output policies ahead of the query, which MXCP only checks
+once the tool has run. When the tool is loaded, each condition is parsed with celpy; the
+deny policies whose condition reads nothing but `user` (e.g. `user.role == 'guest'` on
+aggregate_licenses) are checked before the tool runs, with MXCP's PolicyEnforcer and the
+same reason, so a call they reject never reaches DuckDB. A deny policy reading anything
+else (`response`) is left to MXCP, and so are the deny policies after it, so that the
+first matching policy still gives the reason.
+"""
+import re
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+import celpy
+import yaml
+from mxcp.sdk.executor.context import get_execution_context
+from mxcp.sdk.policy import PolicyDefinitionModel, PolicyEnforcer, PolicySetModel
+
+from license_queries import LICENSE_COLUMNS
+from result_cache import caller_role
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent / 'tools'
+
+# Select list expression replacing a column, per policy action.
+MASKED_SQL = "'****'"
+FILTERED_SQL = 'NULL'
+_ACTIONS = {'mask_fields': MASKED_SQL, 'filter_fields': FILTERED_SQL}
+
+# Reason MXCP gives for a denied output when the policy has none.
+DEFAULT_DENY_REASON = 'Output blocked by policy'
+
+_ROLE_CONDITION = re.compile(r"""^\s*user\.role\s*==\s*(['"])(\w+)\1\s*$""")
+
+_cel = celpy.Environment()
+
+
+@lru_cache(maxsize=None)
+def output_policies(tool: str) -> List[Dict[str, Any]]:
+    """The `policies.output` list of tools/<tool>.yml."""
+    with open(TOOLS_DIR / f'{tool}.yml') as f:
+        return ((yaml.safe_load(f)['tool'].get('policies') or {}).get('output')) or []
+
+
+def condition_variables(condition: str) -> Optional[FrozenSet[str]]:
+    """Names of the variables a CEL condition reads (user, response, ...), or None if it does not parse."""
+    try:
+        tree = _cel.compile(condition)
+    except celpy.CELParseError:
+        return None
+    return frozenset(str(node.children[0]) for node in tree.iter_subtrees() if node.data == 'ident')
+
+
+@lru_cache(maxsize=None)
+def role_columns(tool: str) -> Dict[str, Dict[str, str]]:
+    """Return {role: {column: select list expression}} from the output policies of tools/<tool>.yml."""
+    roles: Dict[str, Dict[str, str]] = {}
+    for policy in output_policies(tool):
+        match = _ROLE_CONDITION.match(policy.get('condition', ''))
+        expression = _ACTIONS.get(policy.get('action'))
+        if match is None or expression is None:
+            continue
+        columns = roles.setdefault(match.group(2), {})
+        for field in policy.get('fields', []):
+            # A dropped field stays dropped whichever policy comes first.
+            if expression == FILTERED_SQL or field not in columns:
+                columns[field] = expression
+    return roles
+
+
+@lru_cache(maxsize=None)
+def _columns_sql(tool: str, role: str) -> str:
+    replaced = role_columns(tool).get(role, {})
+    return ','.join(
+        f"\n  {replaced[column]} AS {column}" if column in replaced else f"\n  {column}"
+        for column in LICENSE_COLUMNS
+    )
+
+
+def columns_sql(tool: str) -> str:
+    """Select list of LICENSE_COLUMNS with the output policies of `tool` for the caller's role applied."""
+    return _columns_sql(tool, caller_role())
+
+
+def user_deny_policies(tool: str) -> List[PolicyDefinitionModel]:
+    """The deny output policies of `tool` that can be checked before it runs; see the module docstring."""
+    policies = []
+    for policy in output_policies(tool):
+        if policy.get('action') != 'deny':
+            continue
+        variables = condition_variables(policy['condition'])
+        if variables is None or not variables <= {'user'}:
+            break
+        policies.append(PolicyDefinitionModel(condition=policy['condition'], action='deny',
+                                              reason=policy.get('reason') or DEFAULT_DENY_REASON))
+    return policies
+
+
+def deny_early(tool: str) -> Callable:
+    """Decorator raising PolicyEnforcementError before the tool runs when a user-only deny output policy matches."""
+    def decorate(func: Callable) -> Callable:
+        policies = user_deny_policies(tool)
+        if not policies:
+            return func
+        # Input policies, because those are evaluated against the user alone and raise the same error.
+        enforcer = PolicyEnforcer(PolicySetModel(input_policies=policies))
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            context = get_execution_context()
+            enforcer.enforce_input_policies(context.user_context if context else None, {})
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,176 @@
+"""
+Shared projection and pagination for the row-returning license tools (search_licenses,
+geo_licenses; nearest_licenses uses the projection only).
+
+Results are ordered by (bl_est_date_d DESC, license_sk DESC, source_hash DESC,
+duplicate_seq DESC). license_sk, the integer surrogate of license_pk, identifies a license,
+not a row: a license has one row per owner/activity, so the row fingerprint source_hash
+breaks ties, and duplicate_seq those between identical source rows. Every row carries an
+opaque `cursor`; passing the last row's cursor back returns the rows after it with a seek predicate instead of an OFFSET, so
+deep pages cost the same as the first one. `page` remains as a fallback when no cursor is
+given.
+
+The statements return the typed DATE and DOUBLE columns as stored; license_records()
+serializes them (and builds the cursors) once per returned row, after LIMIT.
+"""
+import base64
+import binascii
+import math
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Columns returned for each license record.
+LICENSE_COLUMNS = (
+    'license_pk',
+    'emirate_name_en',
+    'emirate_name_ar',
+    'issuance_authority_en',
+    'issuance_authority_ar',
+    'issuance_authority_branch_en',
+    'issuance_authority_branch_ar',
+    'bl',
+    'bl_cbls',
+    'bl_name_ar',
+    'bl_name_en',
+    'bl_est_date',
+    'bl_exp_date',
+    'bl_status_en',
+    'bl_status_ar',
+    'bl_legal_type_en',
+    'bl_legal_type_ar',
+    'bl_type_en',
+    'bl_type_ar',
+    'bl_full_address',
+    'license_latitude',
+    'license_longitude',
+    'license_branch_flag',
+    'parent_licence_license_number',
+    'parent_license_issuance_authority_en',
+    'parent_license_issuance_authority_ar',
+    'relationship_type_en',
+    'relationship_type_ar',
+    'owner_nationality_en',
+    'owner_nationality_ar',
+    'owner_gender',
+    'business_activity_code',
+    'business_activity_desc_en',
+    'business_activity_desc_ar',
+    'license_latitude_1',
+    'license_longitude_1',
+    'bl_est_date_d',
+    'bl_exp_date_d',
+    'lat_dd',
+    'lon_dd',
+)
+LICENSE_COLUMNS_SQL = ''.join(f"\n  {column}," for column in LICENSE_COLUMNS).rstrip(',')
+
+# Typed columns of LICENSE_COLUMNS that license_records() serializes.
+DATE_COLUMNS = ('bl_est_date_d', 'bl_exp_date_d')
+COORDINATE_COLUMNS = ('lat_dd', 'lon_dd')
+
+
+def license_select_sql(columns_sql: str = LICENSE_COLUMNS_SQL) -> str:
+    """
+    SELECT ... FROM of the license records, with a select list of LICENSE_COLUMNS (by
+    default as stored; license_policies masks it per role). license_sk, source_hash and
+    duplicate_seq are only selected for the cursor and are not returned.
+    """
+    return f"""
+SELECT{columns_sql},
+  license_sk,
+  source_hash,
+  duplicate_seq
+FROM dim_licenses_v1
+"""
+
+
+ORDER_BY_SQL = "ORDER BY bl_est_date_d DESC NULLS LAST, license_sk DESC, source_hash DESC, duplicate_seq DESC"
+
+# Rows strictly after the cursor row in ORDER_BY_SQL order. Rows without an establishment
+# date sort last, so they follow every dated cursor.
+_TIEBREAK = (
+    "(license_sk < $cursor_sk::UBIGINT"
+    " OR (license_sk = $cursor_sk::UBIGINT AND source_hash < $cursor_hash)"
+    " OR (license_sk = $cursor_sk::UBIGINT AND source_hash = $cursor_hash AND duplicate_seq < $cursor_seq::BIGINT))"
+)
+SEEK_AFTER_DATED = (
+    "(bl_est_date_d < $cursor_date"
+    f" OR (bl_est_date_d = $cursor_date AND {_TIEBREAK})"
+    " OR bl_est_date_d IS NULL)"
+)
+SEEK_AFTER_UNDATED = f"(bl_est_date_d IS NULL AND {_TIEBREAK})"
+
+_MD5_HEX = re.compile(r'^[0-9a-f]{32}$')
+_UBIGINT = re.compile(r'^[0-9]{1,20}$')
+UBIGINT_MAX = 2 ** 64 - 1
+_SEQ = re.compile(r'^[1-9][0-9]{0,17}$')
+
+
+def encode_cursor(est_date: Optional[str], license_sk: int, source_hash: str, duplicate_seq: int) -> str:
+    """Return the cursor of a row from its (ISO) bl_est_date_d, license_sk, source_hash and duplicate_seq."""
+    return base64.b64encode(f"{est_date or ''}|{license_sk}|{source_hash}|{duplicate_seq}".encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[date], int, str, int]:
+    """Decode a cursor returned by a previous call into (bl_est_date_d, license_sk, source_hash, duplicate_seq)."""
+    try:
+        est_date, license_sk, source_hash, duplicate_seq = base64.b64decode(cursor, validate=True).decode('utf-8').split('|')
+        if not (_UBIGINT.match(license_sk) and int(license_sk) <= UBIGINT_MAX and _MD5_HEX.match(source_hash)
+                and _SEQ.match(duplicate_seq)):
+            raise ValueError
+        return (date.fromisoformat(est_date) if est_date else None), int(license_sk), source_hash, int(duplicate_seq)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor: pass the 'cursor' value of the last row from a previous page") from None
+
+
+def limit_clause(page: int, page_size: int) -> str:
+    """
+    LIMIT/OFFSET clause for `page` of `page_size` rows. The numbers are written into the
+    statement rather than bound: DuckDB plans a prepared statement again on every execution
+    when LIMIT or OFFSET is a parameter (see license_db).
+    """
+    return f"LIMIT {int(page_size)} OFFSET {(int(page) - 1) * int(page_size)}"
+
+
+def page_clause(cursor: Optional[str], page: int, page_size: int) -> Tuple[Tuple[str, ...], str, Dict[str, Any]]:
+    """
+    Return (seek predicates, LIMIT/OFFSET clause, bind values) for either keyset paging
+    (when a cursor is given) or the OFFSET-based `page` fallback.
+    """
+    if cursor is None:
+        return (), limit_clause(page, page_size), {}
+
+    est_date, license_sk, source_hash, duplicate_seq = decode_cursor(cursor)
+    binds = {'cursor_sk': license_sk, 'cursor_hash': source_hash, 'cursor_seq': duplicate_seq}
+    if est_date is None:
+        return (SEEK_AFTER_UNDATED,), f"LIMIT {int(page_size)}", binds
+    binds['cursor_date'] = est_date
+    return (SEEK_AFTER_DATED,), f"LIMIT {int(page_size)}", binds
+
+
+def iso_date(value: Any) -> Optional[str]:
+    """Serialize a DATE value (a date, or the midnight Timestamp db.execute returns) as YYYY-MM-DD."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def license_records(rows: List[Dict[str, Any]], with_cursor: bool = True) -> List[Dict[str, Any]]:
+    """
+    Serialize license rows in place for the tool result: dates as YYYY-MM-DD, missing
+    coordinates (NaN once db.execute has converted the result) as None and, for rows from
+    license_select_sql(), license_sk, source_hash and duplicate_seq replaced by the row cursor.
+    """
+    for row in rows:
+        for column in DATE_COLUMNS:
+            row[column] = iso_date(row[column])
+        for column in COORDINATE_COLUMNS:
+            if row[column] is not None and math.isnan(row[column]):
+                row[column] = None
+        if with_cursor:
+            row['cursor'] = encode_cursor(row['bl_est_date_d'], int(row.pop('license_sk')), row.pop('source_hash'),
+                                          int(row.pop('duplicate_seq')))
+    return rows
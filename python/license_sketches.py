@@ -0,0 +1,26 @@
+"""
+Approximate distinct counts for the `accuracy: approx` mode of aggregate_licenses and
+timeseries_licenses, using the HyperLogLog macros of
+models/marts/dim_licenses_hll_sketches.sql.
+
+The sketch of a group is the max hll_rank() of its licenses per hll_register(). It is
+merged from the stored sketches of dim_licenses_hll_sketches when the filters allow, or
+built from license_sk while scanning dim_licenses, so memory per group is bounded by the
+4096 registers instead of growing with the number of distinct licenses. Every result row
+reports `error_bound`: two relative standard errors of its estimate (about 95% confidence),
+or 0 for exact counts.
+"""
+
+APPROX = 'approx'
+
+# Register columns of a group's sketch, built from the licenses of a dim_licenses scan or
+# merged from stored dim_licenses_hll_sketches cells; both are used with GROUP BY ALL.
+SCAN_REGISTERS_SQL = """hll_register(license_sk) AS register,
+  MAX(hll_rank(license_sk)) AS rank"""
+MERGE_REGISTERS_SQL = """register,
+  MAX(rank) AS rank"""
+
+# Estimate and error bound of a sketch, aggregated over its register rows.
+ESTIMATE_SQL = "hll_estimate(COUNT(*), SUM(pow(0.5, rank)))"
+APPROX_ERROR_SQL = f"2 * hll_error({ESTIMATE_SQL})"
+EXACT_ERROR_SQL = "0.0::DOUBLE"
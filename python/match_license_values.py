@@ -0,0 +1,38 @@
+"""
+match_license_values tool: the valid values of a categorical field closest to a possibly
+misspelled or partial text, by trigram similarity and edit distance.
+"""
+from typing import Any, Dict, List
+
+from license_db import db
+
+MATCH_SQL = """
+WITH query_trigrams AS (
+  SELECT UNNEST(trigrams($text)) AS trigram
+),
+candidates AS (
+  SELECT
+    t.value,
+    COUNT(*) AS shared_trigrams,
+    ANY_VALUE(t.value_trigram_count) AS value_trigram_count
+  FROM dim_licenses_categorical_trigrams t
+  JOIN query_trigrams q ON t.trigram = q.trigram
+  WHERE t.field = $field
+  GROUP BY t.value
+)
+SELECT
+  $field AS field,
+  c.value,
+  v.freq,
+  ROUND(c.shared_trigrams / (len(trigrams($text)) + c.value_trigram_count - c.shared_trigrams), 4) AS similarity,
+  levenshtein(lower(c.value), lower($text)) AS edit_distance
+FROM candidates c
+JOIN dim_licenses_categorical_values v
+  ON v.field = $field AND v.value = c.value
+ORDER BY similarity DESC, edit_distance, v.freq DESC, c.value
+"""
+
+
+def match_license_values(field: str, text: str, k: int = 5) -> List[Dict[str, Any]]:
+    """Return the k values of `field` closest to `text`, closest first."""
+    return db.execute(f"{MATCH_SQL}LIMIT {int(k)}", {'field': field, 'text': text})
@@ -0,0 +1,14 @@
+"""
+licenses://columns resource: the columns of dim_licenses, read through the connection pool
+(license_db) so it follows db-prod.duckdb across swaps like the tools do.
+"""
+from typing import Any, Dict, List
+
+from license_db import db
+
+COLUMNS_SQL = "SELECT name AS column_name, type FROM pragma_table_info('dim_licenses_v1')"
+
+
+def meta_licenses_columns() -> List[Dict[str, Any]]:
+    """Return the name and type of every dim_licenses column."""
+    return db.execute(COLUMNS_SQL)
@@ -0,0 +1,100 @@
+"""
+nearest_licenses tool: the k licenses closest to a point, with the shared deep filters.
+
+The search starts with the grid cells around the point (see license_grid) and doubles the
+ring of cells until the k-th closest license found is nearer than anything outside the
+searched cells could be, so only the neighbourhood of the point is read. Each license is
+returned once, as its record nearest to the point, with the haversine distance in km.
+Licenses without coordinates inside the grid are not searched, and the search does not
+wrap around the antimeridian.
+"""
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from license_db import db
+from license_filters import bind_params, filter_shape, where_clause
+from license_grid import CELLS_PER_DEGREE, GRID_COLUMNS, cell_col, cell_row
+from license_policies import columns_sql, deny_early
+from license_queries import license_records
+
+# Mean Earth radius used by the haversine_km macro (models/marts/dim_licenses_geo_cells.sql).
+EARTH_RADIUS_KM = 6371.0088
+
+GRID_ROWS = 180 * CELLS_PER_DEGREE + 1
+
+# Half-width, in cells, of the first ring searched around the point's cell.
+INITIAL_RING = 1
+
+RING_SQL = """(
+    geo_cell IS NOT NULL AND
+    license_sk IN (
+      SELECT license_sk FROM dim_licenses_geo_cells
+      WHERE cell_row BETWEEN $min_cell_row::BIGINT AND $max_cell_row::BIGINT
+        AND cell_col BETWEEN $min_cell_col::BIGINT AND $max_cell_col::BIGINT
+    )
+  )"""
+
+SELECT_SQL = """
+SELECT{columns},
+  haversine_km($lat, $lon, lat_dd, lon_dd) AS distance_km
+FROM dim_licenses_v1
+"""
+
+NEAREST_SQL = """QUALIFY row_number() OVER (PARTITION BY license_sk ORDER BY distance_km, source_hash) = 1
+ORDER BY distance_km, license_sk"""
+
+
+@lru_cache(maxsize=4096)
+def build_statement(columns: str, shape: Tuple[str, ...], k: int) -> str:
+    """Return the statement ranking the licenses of one ring of cells for a select list and filter shape."""
+    return f"{SELECT_SQL.format(columns=columns)}{where_clause(shape, (RING_SQL,))}\n{NEAREST_SQL}\nLIMIT {int(k)}"
+
+
+def searched_radius_km(lat: float, lon: float, rows: Tuple[int, int], cols: Tuple[int, int]) -> float:
+    """
+    Lower bound on the distance from (lat, lon) to any point outside the given cell rows and
+    columns; infinite when the cells cover the whole grid.
+    """
+    south = rows[0] / CELLS_PER_DEGREE - 90
+    north = (rows[1] + 1) / CELLS_PER_DEGREE - 90
+    west = cols[0] / CELLS_PER_DEGREE - 180
+    east = (cols[1] + 1) / CELLS_PER_DEGREE - 180
+    bounds = [math.inf]
+    # Beyond the south or north edge: at least the latitude difference.
+    if rows[0] > 0:
+        bounds.append(EARTH_RADIUS_KM * math.radians(lat - south))
+    if rows[1] < GRID_ROWS - 1:
+        bounds.append(EARTH_RADIUS_KM * math.radians(north - lat))
+    # Beyond the west or east edge at a searched latitude: by the haversine formula,
+    # sin(d / 2) >= cos(max |lat|) * sin(dlon / 2).
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    if cols[0] > 0:
+        bounds.append(2 * EARTH_RADIUS_KM * math.asin(cos_lat * math.sin(math.radians(lon - west) / 2)))
+    if cols[1] < GRID_COLUMNS - 1:
+        bounds.append(2 * EARTH_RADIUS_KM * math.asin(cos_lat * math.sin(math.radians(east - lon) / 2)))
+    return min(bounds)
+
+
+@deny_early('nearest_licenses')
+def nearest_licenses(lat: float, lon: float, k: int = 20, **filters: Any) -> List[Dict[str, Any]]:
+    """Return the k licenses nearest to (lat, lon); every filter parameter is optional and None means "not set"."""
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Invalid point: lat must be in [-90, 90] and lon in [-180, 180], got ({lat}, {lon})")
+    shape = filter_shape(filters)
+    statement = build_statement(columns_sql('nearest_licenses'), shape, k)
+    row, col = cell_row(lat), min(cell_col(lon), GRID_COLUMNS - 1)
+    ring = INITIAL_RING
+    while True:
+        rows = (max(row - ring, 0), min(row + ring, GRID_ROWS - 1))
+        cols = (max(col - ring, 0), min(col + ring, GRID_COLUMNS - 1))
+        results = db.execute(
+            statement,
+            bind_params(shape, filters, lat=lat, lon=lon,
+                        min_cell_row=rows[0], max_cell_row=rows[1],
+                        min_cell_col=cols[0], max_cell_col=cols[1]),
+        )
+        radius = searched_radius_km(lat, lon, rows, cols)
+        if radius == math.inf or (len(results) == k and results[-1]['distance_km'] <= radius):
+            return license_records(results, with_cursor=False)
+        ring *= 2
@@ -0,0 +1,158 @@
+"""
+In-process LRU cache of license tool results.
+
+Agents repeat the same calls (the same categorical_license_values field, the same
+aggregate_licenses group-by), so @cached_tool keeps the latest results per tool, caller
+role and normalized parameters: defaults applied, unset (None) filters dropped, names
+sorted. The role is part of the key because policies differ per role.
+
+Entries belong to the build generation they were computed on. dbt stamps a new generation
+into build_generation after every run that builds models (macros/build_generation.sql);
+a call that sees a newer generation drops every entry first, so results never outlive the
+database they came from. The generation is only read again when the file db-prod.duckdb
+resolves to, or its modification time, has changed, so a hit runs no query at all. A
+database without a build_generation table is not cached. Hits, misses and invalidations
+are counted per tool and exposed by the license_cache_stats tool.
+
+The cache holds at most MAX_ENTRIES results and MAX_ROWS rows in total, evicting the least
+recently used results beyond either limit, so a few large pages cannot grow it without
+bound. A result of more than MAX_RESULT_ROWS rows is returned without being cached.
+"""
+import inspect
+import json
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+import duckdb
+from mxcp.sdk.executor.context import get_execution_context
+
+from license_db import db
+
+MAX_ENTRIES = 1024
+MAX_ROWS = 50000
+MAX_RESULT_ROWS = 5000
+
+GENERATION_SQL = "SELECT max(generation) AS generation FROM build_generation"
+
+_lock = threading.Lock()
+_entries: 'OrderedDict[tuple, List[Dict[str, Any]]]' = OrderedDict()
+_rows = 0
+_generation: Optional[int] = None
+_version: Optional[tuple] = None
+_invalidations = 0
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def caller_role() -> str:
+    """The caller's role as the policies see it (user.role)."""
+    context = get_execution_context()
+    user = context.user_context if context else None
+    if user is None:
+        return 'anonymous'
+    return (user.raw_profile or {}).get('role', 'user')
+
+
+def normalize_params(signature: inspect.Signature, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Canonical JSON of a call's parameters, so equivalent calls share one key."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params: Dict[str, Any] = {}
+    for name, value in bound.arguments.items():
+        if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+            params.update(value)
+        else:
+            params[name] = value
+    return json.dumps({k: v for k, v in params.items() if v is not None}, sort_keys=True, default=str)
+
+
+def _check_generation() -> Optional[int]:
+    """
+    Drop every entry when the database has been rebuilt since they were computed.
+
+    Returns the current generation, or None when the database has no build_generation table.
+    """
+    global _generation, _version, _invalidations, _rows
+    version = db.version()
+    with _lock:
+        if version == _version:
+            return _generation
+    try:
+        generation = db.execute(GENERATION_SQL)[0]['generation']
+    except duckdb.CatalogException:
+        generation = None
+    with _lock:
+        if generation != _generation or generation is None:
+            if _entries:
+                _invalidations += 1
+            _entries.clear()
+            _rows = 0
+            _generation = generation
+        _version = version
+    return generation
+
+
+def _store(key: tuple, rows: List[Dict[str, Any]]) -> None:
+    """Cache a result, evicting the least recently used ones beyond MAX_ENTRIES or MAX_ROWS; holds _lock."""
+    global _rows
+    previous = _entries.pop(key, None)
+    if previous is not None:
+        _rows -= len(previous)
+    _entries[key] = [dict(row) for row in rows]
+    _rows += len(rows)
+    while len(_entries) > MAX_ENTRIES or _rows > MAX_ROWS:
+        _rows -= len(_entries.popitem(last=False)[1])
+
+
+def cached_tool(tool: str) -> Callable:
+    """Decorator caching a tool function's results; see the module docstring."""
+    def decorate(func: Callable[..., List[Dict[str, Any]]]) -> Callable[..., List[Dict[str, Any]]]:
+        signature = inspect.signature(func)
+        _stats.setdefault(tool, {'hits': 0, 'misses': 0})
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+            generation = _check_generation()
+            if generation is None:
+                return func(*args, **kwargs)
+            key = (tool, caller_role(), normalize_params(signature, args, kwargs))
+            with _lock:
+                rows = _entries.get(key)
+                if rows is not None:
+                    _entries.move_to_end(key)
+                    _stats[tool]['hits'] += 1
+                    # Copies, so later changes to a returned row cannot reach the cache.
+                    return [dict(row) for row in rows]
+                _stats[tool]['misses'] += 1
+
+            rows = func(*args, **kwargs)
+            if len(rows) <= MAX_RESULT_ROWS:
+                with _lock:
+                    if generation == _generation:
+                        _store(key, rows)
+            return rows
+
+        return wrapper
+
+    return decorate
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters per tool plus the size, limits and generation of the cache."""
+    with _lock:
+        tools = []
+        for tool, counts in sorted(_stats.items()):
+            calls = counts['hits'] + counts['misses']
+            tools.append({'tool': tool, 'hits': counts['hits'], 'misses': counts['misses'],
+                          'hit_rate': counts['hits'] / calls if calls else 0.0})
+        return {
+            'generation': _generation,
+            'entries': len(_entries),
+            'max_entries': MAX_ENTRIES,
+            'rows': _rows,
+            'max_rows': MAX_ROWS,
+            'max_result_rows': MAX_RESULT_ROWS,
+            'invalidations': _invalidations,
+            'tools': tools,
+        }
@@ -0,0 +1,34 @@
+"""
+search_licenses tool: flexible license search with deep filtering.
+
+The statement is assembled from only the filters the caller supplied (see license_filters)
+and cached per filter shape. Paging uses the row cursors from license_queries, and the
+select list applies the caller's output policies (license_policies).
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from license_db import db
+from license_filters import bind_params, filter_shape, where_clause
+from license_policies import columns_sql, deny_early
+from license_queries import ORDER_BY_SQL, license_records, license_select_sql, page_clause
+from result_cache import cached_tool
+
+
+@lru_cache(maxsize=4096)
+def build_statement(columns: str, shape: Tuple[str, ...], seek: Tuple[str, ...], limit_sql: str) -> str:
+    """Return the full search statement for a select list, filter shape and paging mode."""
+    return f"{license_select_sql(columns)}{where_clause(shape, seek)}\n{ORDER_BY_SQL}\n{limit_sql}"
+
+
+@deny_early('search_licenses')
+@cached_tool('search_licenses')
+def search_licenses(page: int = 1, page_size: int = 20, cursor: Optional[str] = None,
+                    **filters: Any) -> List[Dict[str, Any]]:
+    """Search licenses; every filter parameter is optional and None means "not set"."""
+    shape = filter_shape(filters)
+    seek, limit_sql, paging = page_clause(cursor, page, page_size)
+    return license_records(db.execute(
+        build_statement(columns_sql('search_licenses'), shape, seek, limit_sql),
+        bind_params(shape, filters, **paging),
+    ))
@@ -0,0 +1,103 @@
+"""
+Shared fixtures of the Python tool tests. The modules under test live in python/, which
+MXCP puts on sys.path when it loads the tools; the tests do the same.
+
+Tests that check tool results use `licenses_db`: the dbt project built on data/licenses.csv,
+150 synthetic licenses plus a few hand-written rows (Arabic spelling variants of one name
+and a duplicated source row).
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import duckdb
+import pytest
+from mxcp.sdk.auth import UserContextModel
+from mxcp.sdk.executor.context import ExecutionContext, reset_execution_context, set_execution_context
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import license_db  # noqa: E402
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+LICENSES_CSV = Path(__file__).resolve().parent / 'data' / 'licenses.csv'
+
+
+@pytest.fixture(scope='session')
+def licenses_db(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """
+    Run `dbt run` on data/licenses.csv into a new database and point license_db.db, the pool
+    the tools query, at it for the session. dbt runs in its own process, which closes the
+    database before the pool opens it read-only. Needs the dbt packages installed (`dbt deps`).
+    """
+    pytest.importorskip('dbt.cli.main')
+    build = tmp_path_factory.mktemp('licenses_db')
+    path = build / 'db-prod.duckdb'
+    result = subprocess.run(
+        [
+            sys.executable, '-m', 'dbt.cli.main', 'run',
+            '--project-dir', str(PROJECT_DIR),
+            '--profiles-dir', str(PROJECT_DIR),
+            '--target-path', str(build / 'target'),
+            '--log-path', str(build / 'logs'),
+            '--vars', json.dumps({'licenses_file': str(LICENSES_CSV)}),
+        ],
+        env=dict(os.environ, LICENSES_DB_PATH=str(path)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        pytest.fail(f"dbt run on {LICENSES_CSV} failed:\n{result.stdout[-4000:]}")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(license_db.db, 'path', str(path))
+        yield path
+
+
+@pytest.fixture
+def as_role() -> Iterator[Callable[[Optional[str]], None]]:
+    """Run the test as a user with the given `role` in its profile (None: no user)."""
+    tokens = []
+
+    def set_role(role: Optional[str]) -> None:
+        user = None
+        if role is not None:
+            user = UserContextModel(provider='test', user_id='test', username='test', raw_profile={'role': role})
+        tokens.append(set_execution_context(ExecutionContext(user_context=user)))
+
+    yield set_role
+    for token in reversed(tokens):
+        reset_execution_context(token)
+
+
+@pytest.fixture
+def make_build(tmp_path: Path) -> Callable[..., Path]:
+    """
+    Create a database file like a build of db-prod.duckdb: a table `t` holding `value`, and a
+    build_generation table stamped `generation` (none when generation is None).
+    """
+    def make(name: str, value: int, generation: Optional[int] = 1) -> Path:
+        path = tmp_path / 'builds' / name / 'db-prod.duckdb'
+        path.parent.mkdir(parents=True)
+        con = duckdb.connect(str(path))
+        con.execute("CREATE TABLE t AS SELECT $value::BIGINT AS v", {'value': value})
+        if generation is not None:
+            con.execute("CREATE TABLE build_generation AS SELECT $generation::BIGINT AS generation",
+                        {'generation': generation})
+        con.close()
+        return path
+
+    return make
+
+
+@pytest.fixture
+def point_to() -> Callable[[Path, Path], None]:
+    """Make `link` a symlink to `build`, replacing it atomically like scripts/build_and_swap.py."""
+    def point(link: Path, build: Path) -> None:
+        tmp = link.with_name(link.name + '.swap')
+        tmp.symlink_to(build)
+        tmp.replace(link)
+
+    return point
@@ -0,0 +1,39 @@
+import pytest
+
+from aggregate_licenses import aggregate_licenses, answerable_from_cube, build_statement, group_columns
+from license_db import db
+from license_filters import bind_params, filter_shape
+
+ALL_GROUPS = 1000
+
+
+def by_group(rows: list) -> list:
+    return sorted(rows, key=lambda row: (str(row['group_1']), str(row['group_2'])))
+
+
+def scanned(group_by=None, metrics='count,distinct_count', **filters) -> list:
+    """The aggregate computed from dim_licenses, whichever source the tool would pick."""
+    shape = filter_shape(filters)
+    return db.execute(
+        f"{build_statement(shape, *group_columns(group_by))}\nLIMIT {ALL_GROUPS}",
+        bind_params(shape, filters, metrics=metrics),
+    )
+
+
+@pytest.mark.parametrize('group_by, filters', [
+    (None, {}),
+    ('emirate_name_en', {}),
+    ('owner_nationality_en,bl_type_en', {}),
+    ('owner_gender', {'bl_status_en': 'Active'}),
+    (None, {'emirate_name_en': 'Dubai', 'owner_nationality_en': 'Emirati'}),
+    ('relationship_type_en', {'relationship_type_en': 'Partner'}),
+])
+def test_cube_answers_like_a_scan(licenses_db, group_by, filters):
+    assert answerable_from_cube(filter_shape(filters), *group_columns(group_by))
+    rows = aggregate_licenses(group_by=group_by, metrics='count,distinct_count', page_size=ALL_GROUPS, **filters)
+    assert rows
+    assert by_group(rows) == by_group(scanned(group_by, **filters))
+
+
+def test_unknown_filter_value_matches_nothing_in_the_cube(licenses_db):
+    assert aggregate_licenses(group_by='emirate_name_en', emirate_name_en='Atlantis') == []
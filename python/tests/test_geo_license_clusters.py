@@ -0,0 +1,49 @@
+import pytest
+
+from geo_license_clusters import answerable_from_tiles, bbox_params, build_statement, geo_license_clusters, tile_zoom
+from license_db import db
+from license_filters import bind_params, filter_shape
+
+ALL_TILES = 10000
+
+
+def by_tile(rows: list) -> dict:
+    return {(row['zoom'], row['tile_x'], row['tile_y']): row for row in rows}
+
+
+def scanned(bbox=None, zoom=8, **filters) -> list:
+    """The clusters computed from dim_licenses, whichever source the tool would pick."""
+    shape = filter_shape(filters)
+    extra = dict(tile_zoom=tile_zoom(zoom), **(bbox_params(bbox) if bbox else {}))
+    return db.execute(f"{build_statement(shape, bbox is not None)}\nLIMIT {ALL_TILES}",
+                      bind_params(shape, filters, **extra))
+
+
+@pytest.mark.parametrize('bbox, zoom, filters', [
+    (None, 0, {}),
+    (None, 8, {}),
+    ('54.0,24.0,56.5,26.5', 5, {}),
+    ('54.0,24.0,56.5,26.5', 10, {'emirate_name_en': 'Dubai'}),
+    ('54.3,24.0,55.0,24.6', 13, {'bl_status_en': 'Active', 'bl_legal_type_en': 'LLC'}),
+    (None, 20, {'bl_type_en': 'Professional'}),
+])
+def test_tile_clusters_match_a_scan(licenses_db, bbox, zoom, filters):
+    assert answerable_from_tiles(filter_shape(filters))
+    clusters = by_tile(geo_license_clusters(bbox=bbox, zoom=zoom, page_size=ALL_TILES, **filters))
+    expected = by_tile(scanned(bbox, zoom, **filters))
+    assert clusters
+    assert clusters.keys() == expected.keys()
+    for tile, row in clusters.items():
+        assert row['count'] == expected[tile]['count']
+        assert row['lat'] == pytest.approx(expected[tile]['lat'])
+        assert row['lon'] == pytest.approx(expected[tile]['lon'])
+
+
+def test_clusters_cover_every_license_in_the_projection(licenses_db):
+    # At the coarsest tile zoom each license lands in one tile.
+    total = sum(row['count'] for row in geo_license_clusters(zoom=0, page_size=ALL_TILES))
+    licenses = db.execute(
+        "SELECT COUNT(DISTINCT license_sk) AS n FROM dim_licenses_v1"
+        " WHERE abs(lat_dd) < 85.0511 AND lon_dd >= -180 AND lon_dd < 180"
+    )[0]['n']
+    assert total == licenses
@@ -0,0 +1,58 @@
+import pytest
+
+from geo_licenses import geo_licenses
+from license_db import db
+from license_grid import BBOX_CELLS_SQL, BBOX_SQL, GRID_COLUMNS, bbox_filter, cell_col, cell_row
+
+ALL_ROWS = 1000
+
+
+def located(rows: list) -> list:
+    return sorted((row['license_pk'], row['lat_dd'], row['lon_dd']) for row in rows)
+
+
+def in_box(bbox: str) -> list:
+    """Licenses inside bbox by a plain comparison of the coordinates of every row."""
+    min_lon, min_lat, max_lon, max_lat = (float(part) for part in bbox.split(','))
+    return located(db.execute(
+        f"SELECT license_pk, lat_dd, lon_dd FROM dim_licenses_v1 WHERE {BBOX_SQL}",
+        {'min_lon': min_lon, 'min_lat': min_lat, 'max_lon': max_lon, 'max_lat': max_lat},
+    ))
+
+
+def test_geo_cell_matches_the_grid_arithmetic(licenses_db):
+    rows = db.execute("SELECT lat_dd, lon_dd, geo_cell FROM dim_licenses_v1 WHERE geo_cell IS NOT NULL")
+    assert rows
+    for row in rows:
+        assert row['geo_cell'] == cell_row(row['lat_dd']) * GRID_COLUMNS + cell_col(row['lon_dd'])
+
+
+@pytest.mark.parametrize('bbox', [
+    '54.3,24.0,56.5,26.5',
+    '55.0,25.0,55.5,25.5',
+    '54.4,24.2,54.45,24.25',
+    '-180,-90,179.99,90',
+])
+def test_bbox_resolved_through_cells_matches_a_scan(licenses_db, bbox):
+    assert bbox_filter(bbox)[0] == BBOX_CELLS_SQL
+    expected = in_box(bbox)
+    assert expected
+    assert located(geo_licenses(bbox=bbox, page_size=ALL_ROWS)) == expected
+
+
+def test_bbox_on_a_license_finds_it(licenses_db):
+    # A box collapsed onto one license's coordinates: the cell bounds and the exact check are inclusive.
+    license = db.execute("SELECT lat_dd, lon_dd FROM dim_licenses_v1 WHERE geo_cell IS NOT NULL LIMIT 1")[0]
+    bbox = f"{license['lon_dd']!r},{license['lat_dd']!r},{license['lon_dd']!r},{license['lat_dd']!r}"
+    rows = geo_licenses(bbox=bbox, page_size=ALL_ROWS)
+    assert rows
+    assert located(rows) == in_box(bbox)
+
+
+def test_bbox_outside_the_grid_is_checked_on_the_coordinates(licenses_db):
+    # The fixture has licenses with latitudes beyond 90, which have no grid cell.
+    bbox = '150,0,170,135'
+    assert bbox_filter(bbox)[0] == BBOX_SQL
+    expected = in_box(bbox)
+    assert expected
+    assert located(geo_licenses(bbox=bbox, page_size=ALL_ROWS)) == expected
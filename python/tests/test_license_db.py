@@ -0,0 +1,125 @@
+import time
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from license_db import NEXT_SUFFIX, ConnectionPool, parameter_casts, sql_literal
+
+
+@pytest.fixture
+def pool(tmp_path, make_build, point_to):
+    """A pool on db-prod.duckdb, a symlink to a first build holding the value 1."""
+    link = tmp_path / 'db-prod.duckdb'
+    point_to(link, make_build('first', value=1))
+    pool = ConnectionPool(str(link), size=2, query_threads=1)
+    yield pool
+    pool.close()
+
+
+def value(connection) -> int:
+    return connection.execute("SELECT v FROM t").fetchone()[0]
+
+
+def test_swap_drains_calls_on_the_old_build(pool, make_build, point_to):
+    link = Path(pool.path)
+    with pool.cursor() as running:
+        old = pool._database
+        point_to(link, make_build('second', value=2))
+
+        # New calls run on the new build while the running call keeps the old one open.
+        assert pool.execute("SELECT v FROM t") == [{'v': 2}]
+        assert old.retired and pool._database is not old
+        assert value(running.connection) == 1
+
+    # The last call on the old build has finished, so it is closed.
+    with pytest.raises(duckdb.ConnectionException):
+        value(running.connection)
+    assert pool.execute("SELECT v FROM t") == [{'v': 2}]
+
+
+def test_idle_old_build_is_closed_at_the_swap(pool, make_build, point_to):
+    pool.execute("SELECT v FROM t")
+    old = pool._database
+    point_to(Path(pool.path), make_build('second', value=2))
+    pool.execute("SELECT v FROM t")
+    with pytest.raises(duckdb.ConnectionException):
+        old.connection.execute("SELECT 1")
+
+
+def test_next_build_is_warmed_before_the_swap(pool, make_build, point_to):
+    hot = "SELECT v FROM t WHERE v > $floor"
+    for _ in range(2):
+        pool.execute(hot, {'floor': 0})
+
+    second = make_build('second', value=2)
+    point_to(Path(pool.path + NEXT_SUFFIX), second)
+    pool.execute("SELECT 1 AS one")
+    deadline = time.monotonic() + 10
+    while pool._next is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    warm = pool._next
+    assert warm is not None and warm.path == str(second)
+    assert all(hot in cursor.statements for cursor in warm.cursors)
+
+    point_to(Path(pool.path), second)
+    assert pool.execute(hot, {'floor': 0}) == [{'v': 2}]
+    assert pool._database is warm and pool._next is None
+
+
+def test_statement_is_prepared_when_it_repeats(pool):
+    query = "SELECT v FROM t LIMIT 1 OFFSET 0"
+    pool.execute(query)
+    assert pool.statement_stats()['prepared'] == 0
+
+    for _ in range(3):
+        assert pool.execute(query) == [{'v': 1}]
+    assert pool.statement_stats()['prepared'] == 1
+    assert pool.statement_stats()['reused'] == 2
+
+
+def test_repeated_statement_reuses_its_cursor(tmp_path, make_build):
+    pool = ConnectionPool(str(make_build('pooled', value=1)), size=4, query_threads=1)
+    try:
+        for _ in range(10):
+            pool.execute("SELECT v FROM t WHERE v > $floor", {'floor': 0})
+        assert pool.statement_stats()['prepared'] == 1
+        assert pool.statement_stats()['reused'] == 8
+    finally:
+        pool.close()
+
+
+def test_call_prefers_the_cursor_holding_its_statement(pool):
+    a, b = "SELECT v FROM t WHERE v > $floor", "SELECT v FROM t WHERE v < $ceiling"
+    for _ in range(2):
+        pool.execute(a, {'floor': 0})
+    # While the cursor holding `a` is busy, `b` is prepared on the other cursor, which is
+    # then returned before the busy one.
+    with pool.cursor(a) as busy:
+        assert a in busy.statements
+        for _ in range(2):
+            pool.execute(b, {'ceiling': 2})
+    pool.execute(b, {'ceiling': 2})
+    pool.execute(a, {'floor': 0})
+    # Each statement is prepared on one cursor only, and both last calls reuse it.
+    assert pool.statement_stats()['prepared'] == 2
+    assert pool.statement_stats()['reused'] == 2
+
+
+@pytest.mark.parametrize('value, literal', [
+    (None, 'NULL'),
+    (True, 'true'),
+    (42, '42'),
+    (2 ** 64 - 1, '18446744073709551615::UBIGINT'),
+    (2 ** 64, None),
+    (1.5, "'1.5'::DOUBLE"),
+    ("O'Brien", "'O''Brien'"),
+    ([1, 2], None),
+])
+def test_sql_literal(value, literal):
+    assert sql_literal(value) == literal
+
+
+def test_parameter_casts_skips_parameters_cast_two_ways():
+    query = "SELECT * FROM t WHERE d >= $start::DATE AND TRY_CAST($e AS e_enum) = e AND $x::DATE < $x::TIMESTAMP"
+    assert parameter_casts(query) == {'start': 'CAST({} AS DATE)', 'e': 'TRY_CAST({} AS e_enum)'}
@@ -0,0 +1,81 @@
+import re
+
+import duckdb
+import pytest
+
+from license_filters import FILTERS, bind_params, filter_shape, predicate, where_clause
+
+
+@pytest.mark.parametrize('name, sql', [
+    ('issuance_authority_en', 'issuance_authority_en = $issuance_authority_en'),
+    ('emirate_name_en', 'emirate_name_en = TRY_CAST($emirate_name_en AS emirate_name_en_enum)'),
+    ('bl_est_date_from', 'bl_est_date_d >= $bl_est_date_from::DATE'),
+    ('bl_exp_date_to', 'bl_exp_date_d <= $bl_exp_date_to::DATE'),
+    ('license_latitude_min', 'lat_dd >= $license_latitude_min::DOUBLE'),
+    ('license_longitude_max', 'lon_dd <= $license_longitude_max::DOUBLE'),
+])
+def test_comparison_predicates(name, sql):
+    assert where_clause((name,)) == f'WHERE {sql}'
+
+
+def test_like_predicate_goes_through_the_trigram_postings():
+    sql = predicate('emirate_name_en_like')
+    assert sql.startswith('emirate_name_en IN (')
+    assert "FROM dim_licenses_text_trigrams\n    WHERE field = 'emirate_name_en'" in sql
+    assert "value ILIKE '%' || $emirate_name_en_like || '%'" in sql
+    assert 'normalize_ar' not in sql
+
+
+def test_arabic_predicates_match_the_normalized_form():
+    eq_sql = predicate('emirate_name_ar')
+    assert 'FROM dim_licenses_ar_normalized' in eq_sql
+    assert "field = 'emirate_name_ar' AND value_norm = normalize_ar($emirate_name_ar)" in eq_sql
+
+    like_sql = predicate('emirate_name_ar_like')
+    assert 'substring_trigrams(normalize_ar($emirate_name_ar_like))' in like_sql
+    assert "normalize_ar(value) ILIKE '%' || normalize_ar($emirate_name_ar_like) || '%'" in like_sql
+
+
+@pytest.mark.parametrize('name, column', [(name, column) for name, column, _ in FILTERS])
+def test_every_predicate_reads_its_own_parameter_and_column(name, column):
+    sql = predicate(name)
+    assert set(re.findall(r'\$(\w+)', sql)) == {name}
+    assert sql.startswith(column + ' ')
+
+
+def test_where_clause_joins_the_shape_in_order_then_the_extras():
+    shape = ('bl_est_date_from', 'license_latitude_min')
+    assert where_clause(shape, ('geo_cell IS NOT NULL',)) == (
+        'WHERE bl_est_date_d >= $bl_est_date_from::DATE'
+        '\n  AND lat_dd >= $license_latitude_min::DOUBLE'
+        '\n  AND geo_cell IS NOT NULL'
+    )
+    assert where_clause(()) == ''
+    assert where_clause((), ('x = 1',)) == 'WHERE x = 1'
+
+
+def test_filter_shape_keeps_supplied_filters_in_filters_order():
+    params = {'license_latitude_min': 24.5, 'bl_name_en_like': '', 'emirate_name_en': None, 'page': 2}
+    assert filter_shape(params) == ('bl_name_en_like', 'license_latitude_min')
+
+
+def test_bind_params_binds_only_the_shape_and_the_extras():
+    params = {'bl_est_date_from': '2020-01-01', 'bl_num': None, 'page_size': 20}
+    assert bind_params(('bl_est_date_from',), params, lat=25.0) == {'bl_est_date_from': '2020-01-01', 'lat': 25.0}
+
+
+def test_bound_predicates_filter_rows():
+    con = duckdb.connect()
+    con.execute("""
+        CREATE TABLE licenses AS
+        SELECT * FROM (VALUES
+            ('Dubai Economy', DATE '2019-05-01', 25.2),
+            ('Dubai Economy', DATE '2021-05-01', 25.2),
+            ('Dubai Economy', DATE '2021-05-01', 24.1),
+            ('Ajman DED', DATE '2021-05-01', 25.4)
+        ) AS t(issuance_authority_en, bl_est_date_d, lat_dd)
+    """)
+    params = {'issuance_authority_en': 'Dubai Economy', 'bl_est_date_from': '2020-01-01', 'license_latitude_min': 25}
+    shape = filter_shape(params)
+    rows = con.execute(f"SELECT count(*) FROM licenses {where_clause(shape)}", bind_params(shape, params)).fetchall()
+    assert rows == [(1,)]
@@ -0,0 +1,86 @@
+import pytest
+from mxcp.sdk.auth import UserContextModel
+from mxcp.sdk.policy import PolicyDefinitionModel, PolicyEnforcementError, PolicyEnforcer, PolicySetModel
+
+from geo_licenses import geo_licenses
+from license_policies import MASKED_SQL, columns_sql, deny_early, output_policies, role_columns, user_deny_policies
+from license_queries import LICENSE_COLUMNS
+from nearest_licenses import nearest_licenses
+from search_licenses import search_licenses
+
+GUEST = UserContextModel(provider='test', user_id='test', username='test', raw_profile={'role': 'guest'})
+
+CALLS = {
+    'search_licenses': lambda: search_licenses(page_size=50),
+    'geo_licenses': lambda: geo_licenses(bbox='54.0,24.0,56.5,26.5', page_size=50),
+    'nearest_licenses': lambda: nearest_licenses(lat=25.2, lon=55.27, k=20),
+}
+
+
+def as_mxcp_returns(tool: str, rows: list) -> list:
+    """`rows` after MXCP has applied the tool's output policies for a guest."""
+    policies = [PolicyDefinitionModel(**policy) for policy in output_policies(tool)]
+    enforcer = PolicyEnforcer(PolicySetModel(output_policies=policies))
+    return enforcer.enforce_output_policies(GUEST, rows)[0]
+
+
+def test_guest_select_list_masks_and_drops_columns():
+    sql = columns_sql('geo_licenses')
+    assert 'owner_gender' in sql and 'lat_dd' in sql
+    guest = role_columns('geo_licenses')['guest']
+    assert guest['owner_gender'] == MASKED_SQL
+    assert guest['lat_dd'] == 'NULL'
+
+
+@pytest.mark.parametrize('tool', sorted(CALLS))
+def test_guest_rows_equal_the_masked_rows_of_other_roles(licenses_db, as_role, tool):
+    as_role('admin')
+    unmasked = CALLS[tool]()
+    as_role('guest')
+    guest = CALLS[tool]()
+    assert guest
+    assert as_mxcp_returns(tool, guest) == as_mxcp_returns(tool, unmasked)
+
+    # Stored columns come masked from the select list already, before MXCP applies the
+    # policies; computed ones (nearest_licenses' distance_km) are left to MXCP.
+    for column, expression in role_columns(tool)['guest'].items():
+        if column in LICENSE_COLUMNS:
+            expected = '****' if expression == MASKED_SQL else None
+            assert all(row[column] == expected for row in guest)
+
+
+def tool_body(calls):
+    @deny_early('aggregate_licenses')
+    def aggregate_licenses(group_by: str):
+        calls.append(group_by)
+        return [{'group_by': group_by}]
+
+    return aggregate_licenses
+
+
+def test_aggregate_licenses_denies_guests_before_the_query():
+    # Its deny policy reads nothing but `user`, so it is checked before the query.
+    assert [policy.condition for policy in user_deny_policies('aggregate_licenses')] == ["user.role == 'guest'"]
+
+
+def test_denied_role_never_reaches_the_tool(as_role):
+    calls = []
+    as_role('guest')
+    with pytest.raises(PolicyEnforcementError, match='Guest users cannot aggregate by sensitive fields'):
+        tool_body(calls)('emirate_name_en')
+    assert calls == []
+
+
+@pytest.mark.parametrize('role', ['admin', 'user', None])
+def test_allowed_role_runs_the_tool(as_role, role):
+    calls = []
+    as_role(role)
+    assert tool_body(calls)('emirate_name_en') == [{'group_by': 'emirate_name_en'}]
+    assert calls == ['emirate_name_en']
+
+
+def test_tool_without_user_deny_policies_is_left_undecorated():
+    def search_licenses():
+        return []
+
+    assert deny_early('search_licenses')(search_licenses) is search_licenses
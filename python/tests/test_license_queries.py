@@ -0,0 +1,94 @@
+import base64
+from datetime import date
+
+import duckdb
+import pytest
+
+from license_filters import where_clause
+from license_queries import (
+    ORDER_BY_SQL, SEEK_AFTER_DATED, SEEK_AFTER_UNDATED, UBIGINT_MAX, decode_cursor, encode_cursor, page_clause,
+)
+
+HASH = '0123456789abcdef0123456789abcdef'
+
+
+def raw_cursor(text: str) -> str:
+    return base64.b64encode(text.encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('est_date, license_sk, duplicate_seq', [
+    ('2021-03-04', 42, 1),
+    (None, 42, 1),
+    ('1999-12-31', 0, 3),
+    ('2021-03-04', UBIGINT_MAX, 1),
+])
+def test_cursor_round_trip(est_date, license_sk, duplicate_seq):
+    cursor = encode_cursor(est_date, license_sk, HASH, duplicate_seq)
+    expected_date = date.fromisoformat(est_date) if est_date else None
+    assert decode_cursor(cursor) == (expected_date, license_sk, HASH, duplicate_seq)
+
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'not base64!',
+    raw_cursor('2021-03-04|42|' + HASH),                  # three fields, from before duplicate_seq
+    raw_cursor('2021-03-04|42|' + HASH + '|1|extra'),
+    raw_cursor('2021-13-04|42|' + HASH + '|1'),           # no such month
+    raw_cursor('2021-03-04|-1|' + HASH + '|1'),
+    raw_cursor(f'2021-03-04|{UBIGINT_MAX + 1}|' + HASH + '|1'),
+    raw_cursor('2021-03-04|42|' + HASH.upper() + '|1'),
+    raw_cursor('2021-03-04|42|' + HASH[:-1] + '|1'),
+    raw_cursor('2021-03-04|42|' + HASH + '|0'),
+    raw_cursor('2021-03-04|42|' + HASH + '|1; DROP TABLE x'),
+    base64.b64encode(b'\xff\xfe|42').decode('ascii'),        # not UTF-8
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_page_clause_without_cursor_uses_offset():
+    assert page_clause(None, 3, 20) == ((), 'LIMIT 20 OFFSET 40', {})
+
+
+def test_page_clause_seeks_past_dated_cursor():
+    seek, limit_sql, binds = page_clause(encode_cursor('2021-03-04', 42, HASH, 2), 5, 20)
+    assert seek == (SEEK_AFTER_DATED,)
+    assert limit_sql == 'LIMIT 20'
+    assert binds == {'cursor_sk': 42, 'cursor_hash': HASH, 'cursor_seq': 2, 'cursor_date': date(2021, 3, 4)}
+
+
+def test_page_clause_seeks_past_undated_cursor():
+    seek, limit_sql, binds = page_clause(encode_cursor(None, 42, HASH, 1), 1, 10)
+    assert seek == (SEEK_AFTER_UNDATED,)
+    assert binds == {'cursor_sk': 42, 'cursor_hash': HASH, 'cursor_seq': 1}
+
+
+def test_keyset_paging_returns_identical_rows_once_each():
+    A, B, C = 'a' * 32, 'b' * 32, 'c' * 32
+    con = duckdb.connect()
+    con.execute(f"""
+        CREATE TABLE dim_licenses_v1 AS
+        SELECT * FROM (VALUES
+            (DATE '2021-03-04', 7::UBIGINT, '{A}', 1::BIGINT),
+            (DATE '2021-03-04', 7::UBIGINT, '{A}', 2::BIGINT),
+            (DATE '2021-03-04', 7::UBIGINT, '{A}', 3::BIGINT),
+            (DATE '2021-03-04', 7::UBIGINT, '{B}', 1::BIGINT),
+            (DATE '2020-01-01', 9::UBIGINT, '{A}', 1::BIGINT),
+            (NULL, 5::UBIGINT, '{C}', 1::BIGINT),
+            (NULL, 5::UBIGINT, '{C}', 2::BIGINT)
+        ) AS t(bl_est_date_d, license_sk, source_hash, duplicate_seq)
+    """)
+    rows, cursor = [], None
+    while True:
+        seek, limit_sql, binds = page_clause(cursor, 1, 1)
+        page = con.execute(
+            f"SELECT * FROM dim_licenses_v1 {where_clause((), seek)}\n{ORDER_BY_SQL}\n{limit_sql}", binds
+        ).fetchall()
+        if not page:
+            break
+        rows.extend(page)
+        est_date, license_sk, source_hash, duplicate_seq = page[-1]
+        cursor = encode_cursor(est_date.isoformat() if est_date else None, license_sk, source_hash, duplicate_seq)
+    assert len(rows) == 7
+    assert rows == con.execute(f"SELECT * FROM dim_licenses_v1 {ORDER_BY_SQL}").fetchall()
@@ -0,0 +1,92 @@
+import math
+
+import pytest
+
+from aggregate_licenses import aggregate_licenses, answerable_from_cube, answerable_from_sketches
+from license_db import db
+from license_sketches import APPROX, APPROX_ERROR_SQL, ESTIMATE_SQL, SCAN_REGISTERS_SQL
+from timeseries_licenses import timeseries_licenses
+
+# The license_sk of `n` made-up licenses, built like license_sk_sql() in macros/license_keys.sql.
+KEYS_SQL = "SELECT CAST('0x' || left(md5(i::VARCHAR), 16) AS UBIGINT) AS license_sk FROM range($n) AS keys(i)"
+
+SKETCH_SQL = f"""
+WITH registers AS (
+  SELECT {SCAN_REGISTERS_SQL}
+  FROM ({KEYS_SQL})
+  GROUP BY ALL
+)
+SELECT
+  {ESTIMATE_SQL} AS estimate,
+  {APPROX_ERROR_SQL} AS error_bound,
+  hll_linear_estimate(COUNT(*)) AS linear,
+  hll_raw_estimate(COUNT(*), SUM(pow(0.5, rank))) AS raw
+FROM registers
+"""
+
+LINEAR_COUNTING_LIMIT = 3 * 4096
+
+
+def sketch(n: int) -> dict:
+    return db.execute(SKETCH_SQL, {'n': n})[0]
+
+
+@pytest.mark.parametrize('n', [10, 1000, 5000, 12000, 15000, 50000, 200000, 1000000])
+def test_estimate_is_within_the_error_bound(licenses_db, n):
+    result = sketch(n)
+    assert 0 < result['error_bound'] < 0.05
+    assert abs(result['estimate'] - n) <= result['error_bound'] * n
+
+
+def test_small_counts_use_linear_counting(licenses_db):
+    result = sketch(5000)
+    assert result['linear'] <= LINEAR_COUNTING_LIMIT
+    assert result['estimate'] == round(result['linear'])
+    # The raw HyperLogLog estimate is biased this low, which is why it is not used.
+    assert abs(result['raw'] - 5000) > 0.05 * 5000
+
+
+def test_large_counts_use_the_raw_estimate(licenses_db):
+    result = sketch(50000)
+    # Every register is set, so linear counting has no estimate (NULL, NaN once fetched).
+    assert math.isnan(result['linear'])
+    assert result['estimate'] == round(result['raw'])
+
+
+def test_switch_happens_at_the_linear_counting_limit(licenses_db):
+    below, above = sketch(12000), sketch(13000)
+    assert below['linear'] <= LINEAR_COUNTING_LIMIT < above['linear']
+    assert below['estimate'] == round(below['linear'])
+    assert above['estimate'] == round(above['raw'])
+
+
+def assert_close_to_exact(approx_rows: list, exact_rows: list, key) -> None:
+    exact = {key(row): row['count'] for row in exact_rows}
+    assert approx_rows and {key(row) for row in approx_rows} == exact.keys()
+    for row in approx_rows:
+        assert row['error_bound'] > 0
+        # In groups this small, one register shared by two licenses is already off by one.
+        assert abs(row['count'] - exact[key(row)]) <= max(row['error_bound'] * exact[key(row)], 1)
+
+
+@pytest.mark.parametrize('group_by, filters', [
+    # Three cube dimensions: merged from the stored sketches.
+    ('emirate_name_en,bl_type_en', {'bl_status_en': 'Active'}),
+    # A filter the sketches cannot apply: built while scanning dim_licenses.
+    ('owner_nationality_en', {'bl_name_en_like': 'a'}),
+])
+def test_approximate_aggregate_is_close_to_the_exact_one(licenses_db, group_by, filters):
+    groups = group_by.split(',')
+    assert not answerable_from_cube(tuple(filters), *(groups + [None])[:2])
+    assert answerable_from_sketches(tuple(filters)) == ('bl_name_en_like' not in filters)
+    exact = aggregate_licenses(group_by=group_by, page_size=1000, **filters)
+    assert all(row['error_bound'] == 0 for row in exact)
+    approx = aggregate_licenses(group_by=group_by, accuracy=APPROX, page_size=1000, **filters)
+    assert_close_to_exact(approx, exact, key=lambda row: (row['group_1'], row['group_2']))
+
+
+def test_approximate_time_series_is_close_to_the_exact_one(licenses_db):
+    params = dict(date_field='bl_est_date_d', interval='year', page_size=1000, owner_gender='Male')
+    exact = timeseries_licenses(**params)
+    approx = timeseries_licenses(accuracy=APPROX, **params)
+    assert_close_to_exact(approx, exact, key=lambda row: row['period'])
@@ -0,0 +1,45 @@
+import pytest
+
+from license_db import db
+from license_filters import bind_params, filter_shape, where_clause
+from nearest_licenses import nearest_licenses
+
+
+def brute_force(lat: float, lon: float, k: int, **filters) -> list:
+    """The k nearest licenses by the distance to every record with a grid cell."""
+    shape = filter_shape(filters)
+    rows = db.execute(
+        "SELECT license_pk, haversine_km($lat, $lon, lat_dd, lon_dd) AS distance_km\n"
+        f"FROM dim_licenses_v1\n{where_clause(shape, ('geo_cell IS NOT NULL',))}\n"
+        "QUALIFY row_number() OVER (PARTITION BY license_sk ORDER BY distance_km, source_hash) = 1\n"
+        f"ORDER BY distance_km, license_sk\nLIMIT {int(k)}",
+        bind_params(shape, filters, lat=lat, lon=lon),
+    )
+    return [(row['license_pk'], row['distance_km']) for row in rows]
+
+
+@pytest.mark.parametrize('lat, lon, k, filters', [
+    (25.2, 55.27, 1, {}),
+    (25.2, 55.27, 20, {}),
+    (24.45, 54.38, 10, {'emirate_name_en': 'Abu Dhabi'}),
+    (24.45, 54.38, 5, {'bl_name_en_like': 'Trading'}),
+    (0.0, 0.0, 3, {}),
+    (-89.5, -179.5, 2, {}),
+])
+def test_ring_search_finds_the_nearest_licenses(licenses_db, lat, lon, k, filters):
+    rows = nearest_licenses(lat=lat, lon=lon, k=k, **filters)
+    expected = brute_force(lat, lon, k, **filters)
+    assert len(rows) == len(expected) == k
+    assert [row['license_pk'] for row in rows] == [pk for pk, _ in expected]
+    assert [row['distance_km'] for row in rows] == pytest.approx([distance for _, distance in expected])
+
+
+def test_k_beyond_the_licenses_returns_all_of_them(licenses_db):
+    rows = nearest_licenses(lat=25.2, lon=55.27, k=1000)
+    assert [row['license_pk'] for row in rows] == [pk for pk, _ in brute_force(25.2, 55.27, 1000)]
+
+
+def test_distance_is_haversine(licenses_db):
+    # 1 degree of latitude on the mean Earth radius.
+    row = db.execute("SELECT haversine_km(25.0, 55.0, 26.0, 55.0) AS km")[0]
+    assert row['km'] == pytest.approx(111.195, abs=0.001)
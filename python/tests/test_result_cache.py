@@ -0,0 +1,140 @@
+from collections import OrderedDict
+
+import pytest
+
+import result_cache
+from license_db import ConnectionPool
+
+
+@pytest.fixture
+def live(tmp_path, monkeypatch, make_build, point_to):
+    """db-prod.duckdb as a symlink to a first build (generation 1), read by a fresh pool and cache."""
+    link = tmp_path / 'db-prod.duckdb'
+    point_to(link, make_build('first', value=1, generation=1))
+    pool = ConnectionPool(str(link), size=2, query_threads=1)
+    monkeypatch.setattr(result_cache, 'db', pool)
+    monkeypatch.setattr(result_cache, '_entries', OrderedDict())
+    monkeypatch.setattr(result_cache, '_rows', 0)
+    monkeypatch.setattr(result_cache, '_generation', None)
+    monkeypatch.setattr(result_cache, '_version', None)
+    monkeypatch.setattr(result_cache, '_invalidations', 0)
+    monkeypatch.setattr(result_cache, '_stats', {})
+    yield link
+    pool.close()
+
+
+@pytest.fixture
+def cached_value():
+    """A cached tool returning the value stored in the database, and the list of its calls."""
+    calls = []
+
+    @result_cache.cached_tool('value')
+    def value(key: str = 'a'):
+        calls.append(key)
+        return result_cache.db.execute("SELECT v FROM t")
+
+    return value, calls
+
+
+@pytest.fixture
+def rows_tool():
+    """A cached tool returning `n` rows, and the list of its calls."""
+    calls = []
+
+    @result_cache.cached_tool('rows')
+    def rows(n: int = 1):
+        calls.append(n)
+        return [{'i': i} for i in range(n)]
+
+    return rows, calls
+
+
+def test_repeated_call_is_served_from_the_cache(live, cached_value):
+    value, calls = cached_value
+    assert value() == [{'v': 1}]
+    assert value(key='a') == [{'v': 1}]
+    assert calls == ['a']
+    assert result_cache.cache_stats()['tools'] == [{'tool': 'value', 'hits': 1, 'misses': 1, 'hit_rate': 0.5}]
+
+
+def test_hit_reads_no_generation(live, cached_value, monkeypatch):
+    value, _ = cached_value
+    value()
+    queries = []
+    execute = result_cache.db.execute
+    monkeypatch.setattr(result_cache.db, 'execute', lambda sql, params=None: queries.append(sql) or execute(sql, params))
+    value()
+    assert queries == []
+
+
+def test_new_generation_invalidates_the_cache(live, cached_value, make_build, point_to):
+    value, calls = cached_value
+    assert value() == [{'v': 1}]
+    point_to(live, make_build('second', value=2, generation=2))
+    assert value() == [{'v': 2}]
+    assert calls == ['a', 'a']
+    stats = result_cache.cache_stats()
+    assert (stats['generation'], stats['invalidations'], stats['entries']) == (2, 1, 1)
+
+
+def test_same_generation_keeps_the_cache(live, cached_value, make_build, point_to):
+    value, calls = cached_value
+    value()
+    point_to(live, make_build('copy', value=1, generation=1))
+    value()
+    assert calls == ['a']
+    assert result_cache.cache_stats()['invalidations'] == 0
+
+
+def test_database_without_build_generation_is_not_cached(live, cached_value, make_build, point_to):
+    value, calls = cached_value
+    point_to(live, make_build('unstamped', value=3, generation=None))
+    assert value() == [{'v': 3}]
+    assert value() == [{'v': 3}]
+    assert calls == ['a', 'a']
+    assert result_cache.cache_stats()['entries'] == 0
+
+
+def test_cache_key_includes_the_role(live, cached_value, as_role):
+    value, calls = cached_value
+    as_role('guest')
+    value()
+    as_role('admin')
+    value()
+    assert len(calls) == 2
+
+
+def test_result_over_max_result_rows_is_not_cached(live, rows_tool, monkeypatch):
+    monkeypatch.setattr(result_cache, 'MAX_RESULT_ROWS', 3)
+    rows, calls = rows_tool
+    for n in (4, 4, 3, 3):
+        assert len(rows(n=n)) == n
+    assert calls == [4, 4, 3]
+    stats = result_cache.cache_stats()
+    assert (stats['entries'], stats['rows'], stats['max_result_rows']) == (1, 3, 3)
+
+
+def test_row_budget_evicts_the_least_recently_used_results(live, rows_tool, monkeypatch):
+    monkeypatch.setattr(result_cache, 'MAX_ROWS', 5)
+    rows, calls = rows_tool
+    rows(n=1)
+    rows(n=2)
+    rows(n=3)
+    # 6 rows: the result of n=1 is evicted.
+    assert (result_cache.cache_stats()['entries'], result_cache.cache_stats()['rows']) == (2, 5)
+    # A hit on n=2 leaves n=3 least recently used, so n=3 makes room for n=1.
+    rows(n=2)
+    rows(n=1)
+    rows(n=2)
+    rows(n=3)
+    assert calls == [1, 2, 3, 1, 3]
+    stats = result_cache.cache_stats()
+    assert stats['rows'] <= stats['max_rows'] == 5
+
+
+def test_new_generation_resets_the_row_count(live, rows_tool, make_build, point_to):
+    rows, _ = rows_tool
+    rows(n=3)
+    point_to(live, make_build('second', value=2, generation=2))
+    rows(n=2)
+    assert result_cache.cache_stats()['rows'] == 2
@@ -0,0 +1,79 @@
+import pytest
+
+from license_db import db
+from search_licenses import search_licenses
+
+ALL_ROWS = 1000
+
+
+def scanned_pks(column: str, text: str) -> list:
+    """license_pk of every row whose `column` contains `text`, by a plain ILIKE over dim_licenses."""
+    rows = db.execute(
+        f"SELECT license_pk FROM dim_licenses_v1 WHERE {column} ILIKE '%' || $text || '%'", {'text': text}
+    )
+    return sorted(row['license_pk'] for row in rows)
+
+
+def searched_pks(**filters) -> list:
+    return sorted(row['license_pk'] for row in search_licenses(page_size=ALL_ROWS, **filters))
+
+
+@pytest.mark.parametrize('column, text', [
+    ('bl_name_en', 'Trading'),
+    ('bl_name_en', 'trading est'),
+    ('bl_full_address', 'Suite'),
+    ('business_activity_desc_en', 'programming'),
+    ('bl', 'BL-9'),
+    ('issuance_authority_en', 'no such authority'),
+])
+def test_like_filter_matches_a_scan(licenses_db, column, text):
+    param = 'bl_num_like' if column == 'bl' else f'{column}_like'
+    expected = scanned_pks(column, text)
+    assert searched_pks(**{param: text}) == expected
+    if text != 'no such authority':
+        assert expected
+
+
+@pytest.mark.parametrize('text', ['LL', 'a', 'Trad%Est', 'Emirates_Trading', '%'])
+def test_like_filter_without_trigrams_matches_a_scan(licenses_db, text):
+    # Shorter than three characters, or containing LIKE wildcards: no trigram lookup.
+    assert searched_pks(bl_name_en_like=text) == scanned_pks('bl_name_en', text)
+
+
+def test_empty_like_filter_is_not_set(licenses_db):
+    assert searched_pks(bl_name_en_like='') == searched_pks()
+
+
+# Spellings of one name in data/licenses.csv: with taa marbuta and hamza, without them,
+# and with diacritics and tatweel.
+EMIRATES_TRADING = ['مؤسسة الإمارات للتجارة', 'مؤسسه الامارات للتجاره', 'مُؤسَّسة الإمـارات للتجارة']
+
+
+@pytest.mark.parametrize('spelling', EMIRATES_TRADING)
+def test_arabic_filter_matches_every_spelling(licenses_db, spelling):
+    rows = search_licenses(page_size=ALL_ROWS, bl_name_ar=spelling)
+    assert sorted(row['bl_name_ar'] for row in rows) == sorted(EMIRATES_TRADING)
+
+
+@pytest.mark.parametrize('text', ['الامارات', 'الإمارات', 'مؤسسه', 'للتجارة'])
+def test_arabic_like_filter_matches_every_spelling(licenses_db, text):
+    rows = search_licenses(page_size=ALL_ROWS, bl_name_ar_like=text)
+    assert sorted(row['bl_name_ar'] for row in rows) == sorted(EMIRATES_TRADING)
+
+
+@pytest.mark.parametrize('spelling, stored', [('اماراتي', 'إماراتي'), ('اخر', 'آخر')])
+def test_arabic_filter_folds_alef_variants(licenses_db, spelling, stored):
+    expected = searched_pks(owner_nationality_ar=stored)
+    assert expected
+    assert searched_pks(owner_nationality_ar=spelling) == expected
+    assert searched_pks(owner_nationality_ar_like=spelling) == expected
+
+
+def test_arabic_like_filter_matches_a_normalized_scan(licenses_db):
+    text = 'دبي'
+    rows = db.execute(
+        "SELECT license_pk FROM dim_licenses_v1"
+        " WHERE normalize_ar(emirate_name_ar) ILIKE '%' || normalize_ar($text) || '%'",
+        {'text': text},
+    )
+    assert searched_pks(emirate_name_ar_like=text) == sorted(row['license_pk'] for row in rows)
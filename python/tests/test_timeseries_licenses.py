@@ -0,0 +1,35 @@
+import pytest
+
+from license_db import db
+from license_filters import bind_params, filter_shape
+from license_queries import iso_date
+from timeseries_licenses import answerable_from_rollup, build_statement, timeseries_licenses
+
+ALL_PERIODS = 1000
+
+
+def scanned(date_field: str, interval: str, metrics='count,distinct_count', **filters) -> list:
+    """The time series computed from dim_licenses, whichever source the tool would pick."""
+    shape = filter_shape(filters)
+    rows = db.execute(
+        f"{build_statement(shape)}\nLIMIT {ALL_PERIODS}",
+        bind_params(shape, filters, date_field=date_field, interval=interval, metrics=metrics),
+    )
+    for row in rows:
+        row['period'] = iso_date(row['period'])
+    return rows
+
+
+@pytest.mark.parametrize('date_field, interval, filters', [
+    ('bl_est_date_d', 'year', {}),
+    ('bl_est_date_d', 'month', {'emirate_name_en': 'Dubai'}),
+    ('bl_exp_date_d', 'quarter', {'bl_status_en': 'Active', 'bl_type_en': 'Professional'}),
+    ('bl_est_date_d', 'week', {'bl_est_date_from': '2018-01-01', 'bl_est_date_to': '2021-06-30'}),
+    ('bl_exp_date_d', 'day', {'bl_legal_type_en': 'LLC', 'bl_exp_date_from': '2020-01-01'}),
+])
+def test_rollup_answers_like_a_scan(licenses_db, date_field, interval, filters):
+    assert answerable_from_rollup(filter_shape(filters), date_field)
+    rows = timeseries_licenses(date_field=date_field, interval=interval, metrics='count,distinct_count',
+                               page_size=ALL_PERIODS, **filters)
+    assert rows
+    assert rows == scanned(date_field, interval, **filters)
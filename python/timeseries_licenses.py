@@ -0,0 +1,131 @@
+"""
+timeseries_licenses tool: license counts per period of a date field, with deep filtering.
+
+When the only filters are exact matches on the rollup dimensions and date ranges on the
+requested date field, the periods are summed from the daily buckets of
+dim_licenses_daily_rollup. Otherwise the statement is built like search_licenses (only
+supplied filters become predicates, see license_filters) and runs on dim_licenses; with
+accuracy='approx', that scan counts each period with a HyperLogLog sketch (see
+license_sketches) instead of an exact distinct count.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from license_db import db
+from license_filters import bind_params, filter_shape, predicate, where_clause
+from license_queries import iso_date, limit_clause
+from license_sketches import APPROX, APPROX_ERROR_SQL, ESTIMATE_SQL, EXACT_ERROR_SQL, SCAN_REGISTERS_SQL
+from result_cache import cached_tool
+
+DATE_FIELDS = ('bl_est_date_d', 'bl_exp_date_d')
+
+# Same dimensions as rollup_dimensions in models/marts/dim_licenses_daily_rollup.sql; each
+# has an exact-match filter of the same name.
+ROLLUP_DIMENSIONS = ('emirate_name_en', 'bl_status_en', 'bl_type_en', 'bl_legal_type_en')
+
+# Date range filters that can be applied to the daily buckets of each date field.
+ROLLUP_DATE_FILTERS = {
+    'bl_est_date_d': {'bl_est_date_from': '>=', 'bl_est_date_to': '<='},
+    'bl_exp_date_d': {'bl_exp_date_from': '>=', 'bl_exp_date_to': '<='},
+}
+
+PERIOD_SQL = """CAST(date_trunc(
+    $interval,
+    CASE
+      WHEN $date_field = 'bl_est_date_d' THEN bl_est_date_d
+      WHEN $date_field = 'bl_exp_date_d' THEN bl_exp_date_d
+      ELSE NULL
+    END
+  ) AS DATE) AS period"""
+
+METRICS_SQL = """
+  CASE WHEN strpos($metrics, 'count') > 0 THEN {count} END AS count,
+  CASE WHEN strpos($metrics, 'distinct_count') > 0 THEN {count} END AS distinct_count,
+  {error} AS error_bound"""
+
+SELECT_SQL = f"""
+SELECT
+  {PERIOD_SQL},{METRICS_SQL.format(count='COUNT(DISTINCT license_sk)', error=EXACT_ERROR_SQL)}
+FROM dim_licenses_v1
+"""
+
+# The same scan with one HyperLogLog sketch per period; {where} is the filter clause.
+APPROX_SQL = f"""
+WITH registers AS (
+SELECT
+  {PERIOD_SQL},
+  {SCAN_REGISTERS_SQL}
+FROM dim_licenses_v1
+{{where}}
+GROUP BY ALL
+)
+SELECT
+  period,{METRICS_SQL.format(count=ESTIMATE_SQL, error=APPROX_ERROR_SQL)}
+FROM registers
+"""
+
+# Every license sits in exactly one daily bucket, so summing the buckets of a period
+# gives its distinct license count.
+ROLLUP_METRICS_SQL = METRICS_SQL.format(count='SUM(license_count)::BIGINT', error=EXACT_ERROR_SQL)
+ROLLUP_SELECT_SQL = f"""
+SELECT
+  CAST(date_trunc($interval, day) AS DATE) AS period,{ROLLUP_METRICS_SQL}
+FROM dim_licenses_daily_rollup
+"""
+
+GROUP_SQL = """GROUP BY period
+ORDER BY period"""
+
+
+@lru_cache(maxsize=4096)
+def build_statement(shape: Tuple[str, ...]) -> str:
+    """Return the full time series statement on dim_licenses for a filter shape."""
+    return f"{SELECT_SQL}{where_clause(shape)}\n{GROUP_SQL}"
+
+
+@lru_cache(maxsize=4096)
+def build_approx_statement(shape: Tuple[str, ...]) -> str:
+    """Return the time series statement with HyperLogLog counts on dim_licenses for a filter shape."""
+    return f"{APPROX_SQL.format(where=where_clause(shape))}{GROUP_SQL}"
+
+
+@lru_cache(maxsize=4096)
+def build_rollup_statement(shape: Tuple[str, ...], date_field: str) -> str:
+    """Return the time series statement on the daily rollup for a filter shape."""
+    date_filters = ROLLUP_DATE_FILTERS[date_field]
+    predicates = ["date_field = $date_field"]
+    for name in shape:
+        if name in date_filters:
+            predicates.append(f"day {date_filters[name]} ${name}::DATE")
+        else:
+            predicates.append(predicate(name))
+    return f"{ROLLUP_SELECT_SQL}WHERE {' AND '.join(predicates)}\n{GROUP_SQL}"
+
+
+def answerable_from_rollup(shape: Tuple[str, ...], date_field: Optional[str]) -> bool:
+    """True when every supplied filter can be applied to the daily buckets of date_field."""
+    if date_field not in DATE_FIELDS:
+        return False
+    allowed = set(ROLLUP_DIMENSIONS) | set(ROLLUP_DATE_FILTERS[date_field])
+    return set(shape) <= allowed
+
+
+@cached_tool('timeseries_licenses')
+def timeseries_licenses(date_field: Optional[str] = None, interval: Optional[str] = None,
+                        metrics: str = 'count', accuracy: str = 'exact', page: int = 1,
+                        page_size: int = 20, **filters: Any) -> List[Dict[str, Any]]:
+    """Count licenses per period; every filter parameter is optional and None means "not set"."""
+    shape = filter_shape(filters)
+    if answerable_from_rollup(shape, date_field):
+        statement = build_rollup_statement(shape, date_field)
+    elif accuracy == APPROX:
+        statement = build_approx_statement(shape)
+    else:
+        statement = build_statement(shape)
+    rows = db.execute(
+        f"{statement}\n{limit_clause(page, page_size)}",
+        bind_params(shape, filters, date_field=date_field, interval=interval, metrics=metrics),
+    )
+    for row in rows:
+        row['period'] = iso_date(row['period'])
+    return rows
@@ -1 +0,0 @@
-SELECT name AS column_name, type FROM pragma_table_info('dim_licenses_v1'); 
\ No newline at end of file
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the single-pass coordinate parser used by dim_licenses against the
+original regex/subquery-based dms_to_dd macro, and checks that both return the
+same value for every input.
+
+The new macros are read straight from models/marts/dim_licenses.sql, so the
+benchmark always measures what the model actually runs:
+
+    ./scripts/benchmark_dms_to_dd.py --rows 10000000
+"""
+import argparse
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+import duckdb
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = Path(__file__).resolve().parent.parent / 'models' / 'marts' / 'dim_licenses.sql'
+
+# The macro as it was before the single-pass parser. The _try variant only swaps the
+# casts for TRY_CAST, so strings such as "25.5.5N" give NULL instead of aborting the
+# query; it is the reference for the parity check.
+LEGACY_MACRO = """
+CREATE OR REPLACE MACRO dms_to_dd_legacy{suffix}(dms) AS (
+    CASE
+        WHEN dms IS NULL THEN NULL
+        ELSE (
+            WITH p AS (
+                SELECT
+                    {cast}(NULLIF(regexp_extract(dms,'([0-9]+)',1),'') AS DOUBLE)            AS deg ,
+                    {cast}(NULLIF(regexp_extract(dms,'[0-9]+.*?([0-9]+)',1),'') AS DOUBLE)   AS minu ,
+                    {cast}(NULLIF(regexp_extract(dms,'([0-9.]+)[^0-9]*[NSEW]',1),'') AS DOUBLE) AS sec ,
+                    regexp_extract(dms,'([NSEW])$',1)                                        AS hemi
+            )
+            SELECT
+                CASE
+                    WHEN deg IS NULL OR minu IS NULL OR sec IS NULL OR hemi = ''
+                    THEN NULL
+                    ELSE
+                        (CASE WHEN hemi IN ('S','W') THEN -1 ELSE 1 END) *
+                        (deg + minu/60 + sec/3600)
+                END
+            FROM p
+        )
+    END
+);
+"""
+
+# Mostly distinct values in the shapes seen in the source: DMS, decimal degrees with a
+# hemisphere, junk and NULLs. High cardinality matters: the legacy subquery is
+# decorrelated per distinct value, so repeated inputs would flatter it.
+GENERATE_COORDS = """
+CREATE OR REPLACE TABLE coords AS
+SELECT CASE i % 10
+         WHEN 9 THEN NULL
+         WHEN 8 THEN 'n/a'
+         WHEN 7 THEN printf('%.6f°%s', 24 + (hash(i) % 1000000) / 1000000.0, 'N')
+         ELSE printf('%d°%d''%.3f"%s', 24 + i % 3, hash(i) % 60, (hash(i * 7) % 60000) / 1000.0,
+                     CASE WHEN i % 2 = 0 THEN 'N' ELSE 'E' END)
+       END AS dms
+FROM range({rows}) t(i)
+"""
+
+# Inputs that exercise every branch of the parser, including the malformed ones.
+EDGE_CASES = [
+    None, '', 'n/a', 'N', '25N', '25.0735°N', '25.0735 S', '25°N', "25°12'N", '25.5.5N',
+    "25°12'30.5\"N", "55°20'10\"E", "25°12'30.5\"S", "55° 20' 10.25\" W", "25:12:30N",
+    "N25°12'30\"", "25°12'30\"N ", '1e5N', '25..5N', "25°12'30.5.1\"N",
+]
+
+
+def load_model_macros(con, model_path: Path):
+    """Create the macros defined in the `{% set dms_to_dd %}` block of the model."""
+    match = re.search(r'{%\s*set dms_to_dd\s*%}(.*?){%\s*endset\s*%}', model_path.read_text(), re.S)
+    if not match:
+        raise ValueError(f"No dms_to_dd macro block found in {model_path}")
+    con.execute(match.group(1))
+
+
+def timed(con, label: str, sql: str) -> float:
+    start = time.perf_counter()
+    result = con.execute(sql).fetchone()
+    elapsed = time.perf_counter() - start
+    logger.info(f"{label}: {elapsed:.2f}s (count={result[0]}, sum={result[1]})")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dim_licenses coordinate parser against the legacy macro.')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='Number of coordinate strings to generate')
+    parser.add_argument('--threads', type=int, default=None, help='DuckDB threads (default: DuckDB decides)')
+    parser.add_argument('--model', type=str, default=str(MODEL_PATH), help='Model file holding the macro definitions')
+
+    args = parser.parse_args()
+
+    con = duckdb.connect()
+    con.execute("SET enable_progress_bar = false")
+    if args.threads:
+        con.execute(f"SET threads = {args.threads}")
+
+    con.execute(LEGACY_MACRO.format(suffix='', cast='CAST'))
+    con.execute(LEGACY_MACRO.format(suffix='_try', cast='TRY_CAST'))
+    load_model_macros(con, Path(args.model))
+
+    logger.info(f"Generating {args.rows:,} coordinate strings...")
+    con.execute(GENERATE_COORDS.format(rows=args.rows))
+
+    legacy = timed(con, "legacy dms_to_dd", "SELECT count(dd), sum(dd) FROM (SELECT dms_to_dd_legacy(dms) AS dd FROM coords)")
+    # Same shape as dim_licenses: parse once per value, then convert.
+    new = timed(con, "single-pass parser", """
+        SELECT count(dd), sum(dd)
+        FROM (
+            SELECT dms_parts_to_dd(p, dms) AS dd
+            FROM (SELECT dms, dms_parts(dms) AS p FROM coords)
+        )
+    """)
+    logger.info(f"Speedup: {legacy / new:.1f}x")
+
+    con.execute("CREATE OR REPLACE TABLE coords AS SELECT * FROM coords UNION ALL SELECT unnest(?::VARCHAR[])", [EDGE_CASES])
+    mismatches = con.execute("""
+        SELECT dms, dms_to_dd_legacy_try(dms) AS legacy_dd, dms_parts_to_dd(p, dms) AS new_dd
+        FROM (SELECT dms, dms_parts(dms) AS p FROM coords)
+        WHERE dms_parts_to_dd(p, dms) IS DISTINCT FROM dms_to_dd_legacy_try(dms)
+           OR dms_to_dd(dms) IS DISTINCT FROM dms_parts_to_dd(p, dms)
+        LIMIT 20
+    """).fetchall()
+    con.close()
+
+    if mismatches:
+        for dms, legacy_dd, new_dd in mismatches:
+            logger.error(f"Mismatch for {dms!r}: legacy={legacy_dd} new={new_dd}")
+        sys.exit(1)
+    logger.info("Parity check passed: identical results for every input")
+
+
+if __name__ == '__main__':
+    main()
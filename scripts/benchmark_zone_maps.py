@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Measures how much of dim_licenses DuckDB's min/max zone maps let typical tool calls skip,
+for the table in arbitrary (CSV-like) order and in the sort order of the model, at a few
+row-group sizes.
+
+The rows come from a built database; --copies repeats them so that a sample file spans
+enough row groups to matter:
+
+    ./scripts/benchmark_zone_maps.py --database db-prod.duckdb --copies 500
+
+For each layout and query the script reports the rows DuckDB actually scanned (from its
+profiler) and the share of the table it skipped.
+"""
+import argparse
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Predicates as license_filters builds them, and the list tools' ordering.
+QUERIES = {
+    'search first page': """
+        SELECT license_sk FROM {table}
+        ORDER BY bl_est_date_d DESC NULLS LAST, license_sk DESC, source_hash DESC
+        LIMIT 20""",
+    'emirate_name_en': """
+        SELECT count(*) FROM {table}
+        WHERE emirate_name_en = $emirate""",
+    'bl_est_date_from/to (1 year)': """
+        SELECT count(*) FROM {table}
+        WHERE bl_est_date_d >= $est_from::DATE AND bl_est_date_d <= $est_to::DATE""",
+    'emirate + bl_est_date_from/to': """
+        SELECT count(*) FROM {table}
+        WHERE emirate_name_en = $emirate
+          AND bl_est_date_d >= $est_from::DATE AND bl_est_date_d <= $est_to::DATE""",
+    'bl_exp_date_from/to (1 year)': """
+        SELECT count(*) FROM {table}
+        WHERE bl_exp_date_d >= $exp_from::DATE AND bl_exp_date_d <= $exp_to::DATE""",
+}
+
+PARAMS_SQL = """
+SELECT
+    (SELECT emirate_name_en FROM dim_licenses_v1 GROUP BY 1 ORDER BY count(*) DESC LIMIT 1) AS emirate,
+    CAST(max(bl_est_date_d) - INTERVAL 1 YEAR AS DATE) AS est_from,
+    max(bl_est_date_d) AS est_to,
+    CAST(median(bl_exp_date_d) AS DATE) AS exp_from,
+    CAST(median(bl_exp_date_d) + INTERVAL 1 YEAR AS DATE) AS exp_to
+FROM dim_licenses_v1
+"""
+
+
+def rows_scanned(con, sql: str, params: dict, profile_path: Path) -> int:
+    """Run sql with the profiler on and return the rows read by its table scans."""
+    con.execute("PRAGMA enable_profiling = 'json'")
+    con.execute(f"PRAGMA profiling_output = '{profile_path}'")
+    con.execute(sql, params).fetchall()
+    con.execute("PRAGMA disable_profiling")
+    return json.loads(profile_path.read_text())['cumulative_rows_scanned']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure zone-map pruning on dim_licenses for typical tool calls.')
+    parser.add_argument('--database', type=str, default='db-prod.duckdb', help='Database built by dbt run')
+    parser.add_argument('--copies', type=int, default=1, help='Times to repeat the rows of dim_licenses')
+    parser.add_argument('--sort-by', type=str, default='emirate_name_en,bl_est_date_d',
+                        help='Sort order to compare with the unsorted table (see var dim_licenses_sort_by)')
+    parser.add_argument('--row-group-sizes', type=str, default='122880,16384',
+                        help='Comma-separated row-group sizes to compare')
+
+    args = parser.parse_args()
+
+    con = duckdb.connect()
+    con.execute("SET enable_progress_bar = false")
+    con.execute(f"ATTACH '{args.database}' AS src (READ_ONLY)")
+    con.execute("USE src")
+    cursor = con.execute(PARAMS_SQL)
+    params = {column[0]: str(value) for column, value in zip(cursor.description, cursor.fetchone())}
+    logger.info(f"Query parameters: {params}")
+
+    sort_by = ', '.join(column.strip() for column in args.sort_by.split(','))
+    layouts = {
+        'unsorted': 'hash(license_sk, source_hash, copy)',
+        f'sorted by {sort_by}': sort_by,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profile_path = Path(tmp) / 'profile.json'
+        for size in (int(s) for s in args.row_group_sizes.split(',')):
+            # ROW_GROUP_SIZE is an ATTACH option of database files
+            con.execute(f"ATTACH '{Path(tmp) / f'rg_{size}.duckdb'}' AS rg_{size} (ROW_GROUP_SIZE {size})")
+            for layout, (label, order_by) in enumerate(layouts.items()):
+                table = f"rg_{size}.licenses_{layout}"
+                start = time.perf_counter()
+                con.execute(f"""
+                    CREATE TABLE {table} AS
+                    -- each copy gets its own license_sk, spread like the real md5-derived keys
+                    SELECT d.* REPLACE (hash(d.license_sk, copy) AS license_sk)
+                    FROM src.dim_licenses_v1 AS d, range({args.copies}) AS copies(copy)
+                    ORDER BY {order_by}
+                """)
+                total = con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                groups = con.execute(
+                    f"SELECT count(DISTINCT row_group_id) FROM pragma_storage_info('{table}')"
+                ).fetchone()[0]
+                logger.info(f"[{size:,} rows/group] {label}: {total:,} rows in {groups} row groups "
+                            f"(built in {time.perf_counter() - start:.1f}s)")
+                for name, sql in QUERIES.items():
+                    used = {k: v for k, v in params.items() if f"${k}" in sql}
+                    scanned = rows_scanned(con, sql.format(table=table), used, profile_path)
+                    logger.info(f"    {name:<32} scanned {scanned:>12,} rows, skipped {1 - scanned / total:6.1%}")
+    con.close()
+
+
+if __name__ == '__main__':
+    main()
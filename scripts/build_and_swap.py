@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Rebuilds the database next to the one the MXCP server is reading, then swaps it in.
+
+`db-prod.duckdb` becomes a symlink to a build `builds/<UTC timestamp>/db-prod.duckdb` (the
+file keeps its name, which dbt-duckdb uses as the catalog name in views). The script copies
+the live build to a new one (so incremental models stay incremental), runs `dbt build` on
+the copy (LICENSES_DB_PATH in profiles.yml; models and tests, the CSV is not seeded) and,
+only if every model and test passed, points the symlink at it with an atomic rename. A
+running server picks the new build up on its next call (python/license_db.py); a failed
+build leaves the live database untouched. For --warm-seconds before the swap,
+`db-prod.duckdb.next` points at the new build: a server called in that window opens it
+and prepares its hot statements, so it switches to a warm database. The previous build is kept for rollback, older
+ones are deleted.
+
+Arguments after the script's own options are passed to dbt build, e.g.:
+
+    ./scripts/build_and_swap.py --vars '{"licenses_file": "seeds/licenses.csv"}'
+"""
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+BUILDS_DIR = 'builds'
+NEXT_SUFFIX = '.next'
+
+
+def build_dirs(live: Path) -> list:
+    """Return the build directories of a live database path, oldest first."""
+    return sorted(path.parent for path in (live.parent / BUILDS_DIR).glob(f'*/{live.name}'))
+
+
+def new_build_path(live: Path) -> Path:
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    build = live.parent / BUILDS_DIR / stamp / live.name
+    build.parent.mkdir(parents=True)
+    return build
+
+
+def point_to(live: Path, build: Path) -> None:
+    """Atomically make `live` a symlink to `build` (a sibling of it, like db-prod.duckdb.next)."""
+    link = live.with_name(live.name + '.swap')
+    if link.is_symlink():
+        link.unlink()
+    link.symlink_to(build.relative_to(live.parent))
+    os.replace(link, live)
+
+
+def build_and_swap(live: Path, dbt_args: list, keep: int, warm_seconds: float = 0) -> Path:
+    """
+    Build into a new file and swap it in; return the new build path.
+
+    Raises subprocess.CalledProcessError (after removing the new file) if dbt build fails.
+    """
+    if live.exists() and not live.is_symlink():
+        # First run on a database built in place: turn it into a build file.
+        current = new_build_path(live)
+        os.replace(live, current)
+        point_to(live, current)
+        logger.info(f"Moved {live.name} to {current}")
+
+    staging = new_build_path(live)
+    if live.exists():
+        logger.info(f"Copying {live.resolve()} to {staging}...")
+        shutil.copyfile(live.resolve(), staging)
+
+    logger.info(f"Building {staging}...")
+    try:
+        subprocess.run(['dbt', 'build', '--exclude-resource-type', 'seed', *dbt_args], cwd=PROJECT_DIR, check=True,
+                       env=dict(os.environ, LICENSES_DB_PATH=str(staging)))
+    except subprocess.CalledProcessError:
+        shutil.rmtree(staging.parent)
+        raise
+
+    next_link = live.with_name(live.name + NEXT_SUFFIX)
+    if warm_seconds > 0:
+        point_to(next_link, staging)
+        logger.info(f"{next_link.name} points to {staging}, waiting {warm_seconds:g}s for running servers to warm it...")
+        time.sleep(warm_seconds)
+
+    point_to(live, staging)
+    if next_link.is_symlink():
+        next_link.unlink()
+    logger.info(f"{live.name} now points to {staging}")
+
+    # A server that has not been called since an earlier swap still reads its file from
+    # the open handle, so removing it is safe.
+    for old in build_dirs(live)[:-keep]:
+        shutil.rmtree(old)
+        logger.info(f"Removed {old}")
+    return staging
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the database into a new file and swap it in atomically.',
+                                     allow_abbrev=False)
+    parser.add_argument('--database', type=str, default=str(PROJECT_DIR / 'db-prod.duckdb'),
+                        help='Live database path the MXCP server reads')
+    parser.add_argument('--keep', type=int, default=2,
+                        help='Builds to keep, including the live one')
+    parser.add_argument('--warm-seconds', type=float, default=5,
+                        help='Seconds running servers get to open and warm the new build before the swap (0 to skip)')
+
+    args, dbt_args = parser.parse_known_args()
+    if args.keep < 1:
+        print("Error: --keep must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        build_and_swap(Path(args.database).absolute(), dbt_args, args.keep, args.warm_seconds)
+    except subprocess.CalledProcessError as e:
+        print(f"Error: dbt build failed ({e.returncode}); the live database is unchanged", file=sys.stderr)
+        sys.exit(e.returncode)
+
+
+if __name__ == '__main__':
+    main()
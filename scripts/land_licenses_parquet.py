@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Converts the raw pipe-delimited licenses CSV into a columnar Parquet landing zone.
+
+The CSV is parsed exactly once per distinct file content. The output is written to
+`<landing-dir>/<sha256 of the CSV>/licenses.parquet` (ZSTD-compressed), so re-running
+the script against an unchanged file only hashes it and skips parsing entirely.
+
+The Parquet file is typed: its columns have the names and types declared for
+src_licenses in models/staging/schema.yml (the dates are DATE columns), so reading it
+needs no parsing or casting. A landed file whose column types no longer match the
+declaration, e.g. one landed before a column was typed, is landed again.
+
+The script prints the dbt vars pointing `src_licenses` at the landed dataset, e.g.:
+
+    dbt run --vars "$(./scripts/land_licenses_parquet.py --input seeds/licenses.csv)"
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+import duckdb
+import yaml
+
+# Set up logging (stderr, so stdout stays clean for the dbt vars)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PARQUET_NAME = 'licenses.parquet'
+CHUNK_SIZE = 8 * 1024 * 1024
+STAGING_SCHEMA = Path(__file__).resolve().parent.parent / 'models' / 'staging' / 'schema.yml'
+
+
+def source_columns(schema_path: Path = STAGING_SCHEMA) -> dict:
+    """Return the {name: type} columns declared for src_licenses in the staging schema."""
+    with open(schema_path) as f:
+        models = yaml.safe_load(f)['models']
+    model = next(m for m in models if m['name'] == 'src_licenses')
+    return {column['name']: column['data_type'].upper() for column in model['columns']}
+
+
+def file_checksum(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file, streamed in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parquet_columns(path: Path) -> dict:
+    """Return the {name: type} columns of a Parquet file."""
+    con = duckdb.connect()
+    try:
+        described = con.execute(f"DESCRIBE SELECT * FROM read_parquet('{path}')").fetchall()
+        return {name: data_type for name, data_type, *_ in described}
+    finally:
+        con.close()
+
+
+def land_csv(csv_path: Path, landing_dir: Path, row_group_size: int) -> Path:
+    """
+    Write the CSV to a checksum-keyed Parquet file, unless it has already been landed.
+
+    Returns the path of the Parquet file.
+    """
+    checksum = file_checksum(csv_path)
+    target = landing_dir / checksum / PARQUET_NAME
+
+    declared = source_columns()
+    if target.exists():
+        if parquet_columns(target) == declared:
+            logger.info(f"{csv_path} is unchanged (sha256 {checksum[:12]}…), reusing {target}")
+            return target
+        logger.info(f"{target} does not have the declared column types, landing it again")
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_target = target.with_suffix('.parquet.tmp')
+
+    logger.info(f"Landing {csv_path} into {target}...")
+    # Same read options and declared columns as src_licenses uses on the raw CSV, so the
+    # landed columns are identical to what it exposes.
+    columns = ', '.join(f"'{name}': '{data_type}'" for name, data_type in declared.items())
+    con = duckdb.connect()
+    try:
+        con.execute(f"""
+            COPY (
+                SELECT *
+                FROM read_csv(
+                       '{csv_path}',
+                       delim='|',
+                       header=true,
+                       auto_detect=false,
+                       dateformat='%d/%m/%Y',
+                       columns={{{columns}}}
+                     )
+            ) TO '{tmp_target}' (FORMAT parquet, COMPRESSION zstd, ROW_GROUP_SIZE {row_group_size})
+        """)
+    finally:
+        con.close()
+
+    # Publish atomically so a crashed run never leaves a half-written dataset behind.
+    os.replace(tmp_target, target)
+    logger.info(f"Successfully landed {csv_path}")
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Land the raw licenses CSV as a checksum-keyed Parquet dataset.')
+    parser.add_argument('--input', type=str, required=True, help='Path to the raw licenses CSV (e.g., seeds/licenses.csv)')
+    parser.add_argument('--landing-dir', type=str, default='landing/licenses',
+                        help='Directory holding the landed Parquet datasets')
+    parser.add_argument('--row-group-size', type=int, default=122880,
+                        help='Rows per Parquet row group')
+
+    args = parser.parse_args()
+
+    csv_path = Path(args.input)
+    if not csv_path.exists():
+        print(f"Error: input file not found: {csv_path}", file=sys.stderr)
+        sys.exit(1)
+
+    parquet_path = land_csv(csv_path, Path(args.landing_dir), args.row_group_size)
+    print(json.dumps({'licenses_parquet': str(parquet_path)}))
+
+
+if __name__ == '__main__':
+    main()
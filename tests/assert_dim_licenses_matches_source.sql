@@ -0,0 +1,20 @@
+-- dim_licenses is built incrementally, yet must always hold exactly the rows of the current
+-- source: licenses removed from the source deleted, changed ones fully replaced. This test
+-- returns the licenses whose row count in the mart differs from the source.
+
+WITH source_rows AS (
+    SELECT {{ license_sk_sql(license_pk_sql()) }} AS license_sk, COUNT(*) AS source_rows
+    FROM {{ ref('stg_licenses_raw') }}
+    GROUP BY ALL
+),
+
+mart_rows AS (
+    SELECT license_sk, COUNT(*) AS mart_rows
+    FROM {{ ref('dim_licenses', version='1') }}
+    GROUP BY ALL
+)
+
+SELECT license_sk, source_rows, mart_rows
+FROM source_rows
+FULL OUTER JOIN mart_rows USING (license_sk)
+WHERE source_rows IS DISTINCT FROM mart_rows
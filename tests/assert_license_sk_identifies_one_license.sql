@@ -0,0 +1,8 @@
+-- license_sk keeps only 64 of the 128 bits of license_pk, and the tools count, join and
+-- page on it in place of license_pk. This test returns the surrogate keys that two
+-- different licenses collide on.
+
+SELECT license_sk
+FROM {{ ref('dim_licenses', version='1') }}
+GROUP BY license_sk
+HAVING COUNT(DISTINCT license_pk) > 1
@@ -0,0 +1,13 @@
+-- dim_licenses_daily_rollup sums daily distinct license counts into weeks, months and years.
+-- That is only exact if every license has a single establishment date, expiry date and
+-- value for each rollup dimension. This test returns the licenses that break the rule.
+
+SELECT license_pk
+FROM {{ ref('dim_licenses', version='1') }}
+GROUP BY license_pk
+HAVING COUNT(DISTINCT COALESCE(CAST(bl_est_date_d AS VARCHAR), '<null>')) > 1
+    OR COUNT(DISTINCT COALESCE(CAST(bl_exp_date_d AS VARCHAR), '<null>')) > 1
+    OR COUNT(DISTINCT COALESCE(emirate_name_en, '<null>')) > 1
+    OR COUNT(DISTINCT COALESCE(bl_status_en, '<null>')) > 1
+    OR COUNT(DISTINCT COALESCE(bl_type_en, '<null>')) > 1
+    OR COUNT(DISTINCT COALESCE(bl_legal_type_en, '<null>')) > 1